@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# c_bench.py · v0.2.0
+"""
+Benchmarks for the synthetic C generators and the task factories.
+
+Suites
+------
+scaling     ``build_c`` (basic + adv) at growing ``loc``; µs/line should stay flat
+generators  each kind in ``_REGISTRY`` on its own, against a warmed-up state
+tasks       each task in ``TASK_TABLE`` / ``_TASK_TABLE`` on its own
+e2e         end-to-end ``build_c`` at several ``loc`` and ``make_record`` at
+            several ``n``: lines/s, records/s, bytes/s and ``py_heap_peak_mb``,
+            the peak of Python heap allocations (not RSS: one extra untimed
+            run per size under ``tracemalloc``, peak reset in between, so
+            sizes don't share a peak)
+
+Results can be written as JSON (--json) so runs can be diffed over time.
+
+Usage
+-----
+python c_bench.py
+python c_bench.py --suite generators,tasks --json bench.json
+python c_bench.py --sizes 1000,10000,100000 --records 1000,100000 --repeat 3
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import c_gen
+import c_gen_adv
+import c_task_factory_advanced
+import c_task_factory_basic
+
+__version__ = "0.2.0"
+
+GEN_MODULES = (c_gen, c_gen_adv)
+TASK_MODULES = (
+    (c_task_factory_basic, c_task_factory_basic.TASK_TABLE),
+    (c_task_factory_advanced, c_task_factory_advanced._TASK_TABLE),
+)
+SUITES = ("scaling", "generators", "tasks", "e2e")
+PY_HEAP_NOTE = "py_heap_peak_mb: peak Python heap allocation (tracemalloc), not process RSS"
+
+def _encode_records(mod, n: int, seed: int) -> int:
+    rng = random.Random(seed)
+    return sum(len(json.dumps(mod.make_record(rng), ensure_ascii=False)) + 1 for _ in range(n))
+
+def py_heap_peak_mb(fn: Callable[[], object]) -> float:
+    """Peak Python heap allocated while ``fn`` runs, from a fresh ``tracemalloc`` peak.
+
+    This is not RSS: memory outside the Python allocators (interpreter,
+    C extensions, freed arenas) is not counted. ``ru_maxrss`` only ever grows
+    within a process, so it would report the largest size benchmarked so far
+    rather than this run.
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    try:
+        fn()
+        return (tracemalloc.get_traced_memory()[1] - base) / (1 << 20)
+    finally:
+        if started:
+            tracemalloc.stop()
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+# ──────────────────────────────────────────────────────────────
+# Suites
+# ──────────────────────────────────────────────────────────────
+
+def bench_scaling(sizes: List[int], repeat: int = 3, seed: int = 0) -> List[Dict]:
+    """Build time and µs/line for each module at each ``loc``."""
+    rows = []
+    for mod in GEN_MODULES:
+        for loc in sizes:
+            cfg = mod.CConfig(loc=loc, seed=seed)
+            secs = _best_of(lambda: mod.build_c(cfg), repeat)
+            rows.append({"module": mod.__name__, "loc": loc, "seconds": secs,
+                         "us_per_line": secs / loc * 1e6})
+    return rows
+
+def bench_generators(calls: int = 20_000, warmup_loc: int = 2_000, seed: int = 0) -> List[Dict]:
+    """Per-kind cost of every registered generator, incl. how often it returns ""."""
+    rows = []
+    for mod in GEN_MODULES:
+        cfg = mod.CConfig(loc=warmup_loc, seed=seed)
+        kinds = list(mod._REGISTRY)
+        for kind, fn in mod._REGISTRY.items():
+            rng = random.Random(seed)
+            state = mod.new_state(cfg, rng)
+            for _ in range(warmup_loc // 4):    # fill symbol tables like a real file
+                mod._REGISTRY[rng.choice(kinds)](state)
+            empty = out = 0
+            t0 = time.perf_counter()
+            for _ in range(calls):
+                snippet = fn(state)
+                if snippet:
+                    out += len(snippet)
+                else:
+                    empty += 1
+            secs = time.perf_counter() - t0
+            rows.append({"module": mod.__name__, "kind": kind, "calls": calls,
+                         "us_per_call": secs / calls * 1e6, "empty_returns": empty,
+                         "bytes_per_call": out / calls})
+    return rows
+
+def bench_tasks(calls: int = 20_000, seed: int = 0) -> List[Dict]:
+    """Per-task cost of every entry in the factories' task tables."""
+    rows = []
+    for mod, table in TASK_MODULES:
+        for name, gen in table.items():
+            rng = random.Random(seed)
+            secs = _best_of(lambda: [gen(rng) for _ in range(calls)], 1)
+            rows.append({"module": mod.__name__, "task": name, "calls": calls,
+                         "us_per_call": secs / calls * 1e6})
+    return rows
+
+def bench_e2e_files(sizes: List[int], repeat: int = 1, seed: int = 0) -> List[Dict]:
+    """Whole-file ``build_c`` throughput, plus its peak Python heap allocation."""
+    rows = []
+    for mod in GEN_MODULES:
+        for loc in sizes:
+            cfg = mod.CConfig(loc=loc, seed=seed)
+            code = mod.build_c(cfg)
+            secs = _best_of(lambda: mod.build_c(cfg), repeat)
+            rows.append({"module": mod.__name__, "loc": loc, "seconds": secs,
+                         "lines_per_sec": code.count("\n") / secs,
+                         "bytes_per_sec": len(code.encode("utf-8")) / secs,
+                         "py_heap_peak_mb": py_heap_peak_mb(lambda: mod.build_c(cfg))})
+    return rows
+
+def bench_e2e_records(records: List[int], repeat: int = 1, seed: int = 0) -> List[Dict]:
+    """``make_record`` + JSON encoding throughput, plus its peak Python heap allocation."""
+    rows = []
+    for mod, _ in TASK_MODULES:
+        for n in records:
+            size = _encode_records(mod, n, seed)
+            secs = _best_of(lambda: _encode_records(mod, n, seed), repeat)
+            rows.append({"module": mod.__name__, "n": n, "seconds": secs,
+                         "records_per_sec": n / secs, "bytes_per_sec": size / secs,
+                         "py_heap_peak_mb": py_heap_peak_mb(lambda: _encode_records(mod, n, seed))})
+    return rows
+
+# ──────────────────────────────────────────────────────────────
+# Report
+# ──────────────────────────────────────────────────────────────
+
+def _print_rows(title: str, rows: List[Dict]) -> None:
+    print(f"== {title}")
+    if not rows:
+        return
+    cols = list(rows[0])
+    width = {c: max(len(c), *(len(_fmt(r.get(c))) for r in rows)) for c in cols}
+    print("  " + "  ".join(c.rjust(width[c]) for c in cols))
+    for r in rows:
+        print("  " + "  ".join(_fmt(r.get(c)).rjust(width[c]) for c in cols))
+
+def _fmt(v: object) -> str:
+    if isinstance(v, float):
+        return f"{v:,.2f}"
+    if isinstance(v, int):
+        return f"{v:,}"
+    return "-" if v is None else str(v)
+
+def _cli() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark the synthetic C generators and task factories.")
+    ap.add_argument("--suite", type=str, default=",".join(SUITES),
+                    help=f"Comma-separated suites ({', '.join(SUITES)})")
+    ap.add_argument("--sizes", type=str, default="1000,10000,100000",
+                    help="Comma-separated loc values")
+    ap.add_argument("--records", type=str, default="1000,10000",
+                    help="Comma-separated record counts for the e2e factory runs")
+    ap.add_argument("--calls", type=int, default=20_000, help="Calls per generator / task")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per size (best is kept)")
+    ap.add_argument("--seed", type=int, default=0, help="Random seed")
+    ap.add_argument("--json", type=str, help="Write results to this JSON file")
+    args = ap.parse_args()
+
+    suites = args.suite.split(",")
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        ap.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+    sizes = [int(s) for s in args.sizes.split(",")]
+    records = [int(s) for s in args.records.split(",")]
+
+    results: Dict[str, List[Dict]] = {}
+    if "scaling" in suites:
+        results["scaling"] = bench_scaling(sizes, args.repeat, args.seed)
+    if "generators" in suites:
+        results["generators"] = bench_generators(args.calls, seed=args.seed)
+    if "tasks" in suites:
+        results["tasks"] = bench_tasks(args.calls, args.seed)
+    if "e2e" in suites:
+        results["e2e_files"] = bench_e2e_files(sizes, args.repeat, args.seed)
+        results["e2e_records"] = bench_e2e_records(records, args.repeat, args.seed)
+
+    for title, rows in results.items():
+        _print_rows(title, rows)
+    if "e2e" in suites:
+        print(f"({PY_HEAP_NOTE})")
+
+    if args.json:
+        report = {
+            "meta": {
+                "bench": __version__,
+                "c_gen": c_gen.__version__,
+                "c_gen_adv": c_gen_adv.__version__,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "py_heap_peak_mb": PY_HEAP_NOTE,
+            },
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+            fh.write("\n")
+        print(f"✔ wrote results → {args.json}")
+
+if __name__ == "__main__":
+    _cli()
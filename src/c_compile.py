@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+# c_compile.py · v0.1.0
+"""
+Compile smoke-tests for generated C, at corpus scale.
+
+Highlights
+----------
+* Compiler lookup (clang, then gcc) happens once per process, not per file
+* Checks run in parallel over a worker pool (compilers are separate processes,
+  so threads are enough)
+* --batch N hands N units to ONE compiler invocation with -fsyntax-only; each
+  unit stays its own translation unit, so generated names never collide, and
+  failures are attributed per unit from the diagnostics
+* Per-unit pass/fail plus throughput statistics
+* Content-addressed result cache (one SQLite file, LRU-bounded) keyed on
+  source hash + compiler + version + flags; --no-cache to bypass
+* --engine async drives the compilers from one asyncio loop (c_scheduler.py)
+  instead of a thread per in-flight job
+
+Usage
+-----
+python c_compile.py a.c b.c
+python c_compile.py corpus/ --jobs 8 --batch 64
+python c_compile.py corpus/ --cache /tmp/cc.sqlite --cache-mb 512
+python c_compile.py corpus/ --jobs 16 --engine async
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from c_scheduler import TIMEOUT_RC, ExecResult, Scheduler
+
+__version__ = "0.1.0"
+
+COMPILERS: Tuple[str, ...] = ("clang", "gcc")
+ENGINES: Tuple[str, ...] = ("threads", "async")
+DEFAULT_FLAGS: Tuple[str, ...] = ("-std=c17", "-Werror")
+DEFAULT_CACHE = Path(os.environ.get("C_COMPILE_CACHE", "~/.cache/c_compile.sqlite")).expanduser()
+
+Unit = Tuple[str, str]          # (name, source)
+T = TypeVar("T")
+R = TypeVar("R")
+
+# ──────────────────────────────────────────────────────────────
+# Results
+# ──────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class CheckResult:
+    name: str
+    ok: bool
+    stderr: str = ""
+    transient: bool = False     # timed out / killed: not a compiler verdict, never cached
+
+@dataclass
+class CheckStats:
+    units: int = 0
+    passed: int = 0
+    processes: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def failed(self) -> int:
+        return self.units - self.passed
+
+    @property
+    def seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> str:
+        rate = self.units / self.seconds if self.seconds else 0.0
+        return (f"{self.passed:,}/{self.units:,} passed, {self.failed:,} failed · "
+                f"{self.processes:,} compiler runs · {rate:,.1f} units/s")
+
+# ──────────────────────────────────────────────────────────────
+# Helpers
+# ──────────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=None)
+def find_compiler(candidates: Tuple[str, ...] = COMPILERS) -> Optional[str]:
+    """First compiler on PATH, looked up once per process."""
+    for name in candidates:
+        if shutil.which(name):
+            return name
+    return None
+
+@lru_cache(maxsize=None)
+def compiler_version(compiler: str) -> str:
+    """First line of ``compiler --version``, queried once per process."""
+    proc = subprocess.run([compiler, "--version"], text=True, capture_output=True)
+    return proc.stdout.splitlines()[0] if proc.stdout else compiler
+
+def bounded_map(pool: Executor, fn: Callable[[T], R], items: Iterable[T],
+                window: int) -> Iterator[R]:
+    """Ordered ``pool.map`` that keeps at most ``window`` jobs in flight."""
+    pending: Deque[Future] = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def _chunks(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    chunk: List[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# ──────────────────────────────────────────────────────────────
+# Result cache
+# ──────────────────────────────────────────────────────────────
+
+class CompileCache:
+    """Compile results in one SQLite file, keyed by content, LRU-evicted by size.
+
+    Keys hash the source together with compiler, compiler version and flags, so
+    a toolchain upgrade or flag change never serves stale results. Safe to share
+    between the worker threads of one :class:`CompileChecker`.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE, max_bytes: int = 256 << 20) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, ok INTEGER NOT NULL, stderr TEXT NOT NULL,"
+            " size INTEGER NOT NULL, used INTEGER NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS results_used ON results(used);"
+        )
+        row = self._db.execute("SELECT COALESCE(SUM(size), 0), COALESCE(MAX(used), 0) FROM results").fetchone()
+        self._bytes, self._clock = row
+
+    @staticmethod
+    def key(code: str, compiler: str, flags: Sequence[str]) -> str:
+        h = hashlib.sha256()
+        for part in (compiler, compiler_version(compiler), "\0".join(flags), code):
+            h.update(part.encode("utf-8"))
+            h.update(b"\x00")
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[bool, str]]:
+        with self._lock:
+            row = self._db.execute("SELECT ok, stderr FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._clock += 1
+            self._db.execute("UPDATE results SET used = ? WHERE key = ?", (self._clock, key))
+            return bool(row[0]), row[1]
+
+    def put(self, key: str, ok: bool, stderr: str) -> None:
+        size = len(key) + len(stderr.encode("utf-8"))
+        with self._lock:
+            self._clock += 1
+            old = self._db.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                             (key, int(ok), stderr, size, self._clock))
+            self._bytes += size - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # drop least-recently-used rows until we are back under 90 % of the bound
+        target = int(self.max_bytes * 0.9)
+        while self._bytes > target:
+            rows = self._db.execute("SELECT key, size FROM results ORDER BY used LIMIT 256").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._bytes <= target:
+                    break
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._bytes -= size
+                self.evictions += 1
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return (f"cache {self.hits:,} hits / {self.misses:,} misses ({rate:.0%}) · "
+                f"{self.evictions:,} evicted · {self._bytes / (1 << 20):.1f} MiB")
+
+    def close(self) -> None:
+        self._db.close()
+
+# ──────────────────────────────────────────────────────────────
+# Checker
+# ──────────────────────────────────────────────────────────────
+
+class CompileChecker:
+    """Run compile smoke-tests with one compiler lookup and a worker pool.
+
+    ``engine="async"`` replaces the thread pool with a :class:`Scheduler`:
+    ``jobs`` compilers run at once, all driven from the calling thread.
+    """
+
+    def __init__(self, compilers: Tuple[str, ...] = COMPILERS,
+                 flags: Sequence[str] = DEFAULT_FLAGS, jobs: Optional[int] = None,
+                 syntax_only: bool = False, timeout: float = 60.0,
+                 cache: Optional[CompileCache] = None, engine: str = "threads") -> None:
+        if engine not in ENGINES:
+            raise ValueError(f"engine must be one of {ENGINES}, not {engine!r}")
+        self.engine = engine
+        self.compiler = find_compiler(tuple(compilers))
+        self.flags = list(flags)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.syntax_only = syntax_only
+        self.timeout = timeout
+        self.cache = cache
+        self.stats = CheckStats()
+        self._lock = threading.Lock()
+
+    def _run(self, args: List[str], stdin: Optional[str] = None) -> ExecResult:
+        with self._lock:
+            self.stats.processes += 1
+        try:
+            proc = subprocess.run([self.compiler, *args], input=stdin, text=True,
+                                  capture_output=True, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            return ExecResult(TIMEOUT_RC, "", f"timed out after {self.timeout}s\n", timed_out=True)
+        return ExecResult(proc.returncode, proc.stdout, proc.stderr)
+
+    @staticmethod
+    def _verdict(name: str, res: ExecResult) -> CheckResult:
+        return CheckResult(name, res.returncode == 0, res.stderr,
+                           transient=res.timed_out or res.returncode < 0)
+
+    def _cache_key(self, code: str, syntax_only: bool) -> Optional[str]:
+        if self.cache is None:
+            return None
+        mode = "-fsyntax-only" if syntax_only else "-o"
+        return self.cache.key(code, self.compiler, [*self.flags, mode])
+
+    def _cached(self, key: Optional[str], name: str) -> Optional[CheckResult]:
+        hit = self.cache.get(key) if key is not None else None
+        return CheckResult(name, *hit) if hit is not None else None
+
+    def _store(self, key: Optional[str], res: CheckResult) -> CheckResult:
+        """Cache deterministic compiler verdicts only (never timeouts or kills)."""
+        if key is not None and not res.transient:
+            self.cache.put(key, res.ok, res.stderr)
+        return res
+
+    def _unit_args(self, syntax_only: Optional[bool] = None) -> List[str]:
+        if syntax_only is None:
+            syntax_only = self.syntax_only
+        out = ["-fsyntax-only"] if syntax_only else ["-o", os.devnull]
+        return ["-x", "c", "-", *self.flags, *out]
+
+    def check(self, code: str, name: str = "<stdin>") -> CheckResult:
+        """Compile a single unit from stdin."""
+        if self.compiler is None:
+            raise RuntimeError("No C compiler found")
+        key = self._cache_key(code, self.syntax_only)
+        cached = self._cached(key, name)
+        if cached is not None:
+            return cached
+        return self._store(key, self._verdict(name, self._run(self._unit_args(), stdin=code)))
+
+    async def _acheck(self, sched: Scheduler, unit: Unit) -> CheckResult:
+        name, code = unit
+        key = self._cache_key(code, self.syntax_only)
+        cached = self._cached(key, name)
+        if cached is not None:
+            return cached
+        self.stats.processes += 1
+        res = await sched.exec([self.compiler, *self._unit_args()], code, self.timeout)
+        return self._store(key, self._verdict(name, res))
+
+    def _check_batch(self, units: List[Unit]) -> List[CheckResult]:
+        keys = [self._cache_key(code, True) for _, code in units]
+        results: List[Optional[CheckResult]] = [self._cached(k, name) for k, (name, _) in zip(keys, units)]
+        todo = [i for i, r in enumerate(results) if r is None]
+        if todo:
+            fresh = self._compile_batch([units[i] for i in todo])
+            if fresh is None:               # batch verdict unusable: ask per unit
+                fresh = [self._uncached_check(units[i]) for i in todo]
+            for i, res in zip(todo, fresh):
+                results[i] = self._store(keys[i], res)
+        return results  # type: ignore[return-value]
+
+    def _uncached_check(self, unit: Unit) -> CheckResult:
+        name, code = unit
+        return self._verdict(name, self._run(self._unit_args(True), stdin=code))
+
+    async def _aunit(self, sched: Scheduler, unit: Unit) -> CheckResult:
+        name, code = unit
+        self.stats.processes += 1
+        return self._verdict(name, await sched.exec([self.compiler, *self._unit_args(True)], code,
+                                                    self.timeout))
+
+    async def _acheck_batch(self, sched: Scheduler, units: List[Unit]) -> List[CheckResult]:
+        keys = [self._cache_key(code, True) for _, code in units]
+        results: List[Optional[CheckResult]] = [self._cached(k, name) for k, (name, _) in zip(keys, units)]
+        todo = [i for i, r in enumerate(results) if r is None]
+        if todo:
+            batch = [units[i] for i in todo]
+            with tempfile.TemporaryDirectory(prefix="c_compile_") as tmp:
+                paths = self._write_batch(tmp, batch)
+                self.stats.processes += 1
+                res = await sched.exec([self.compiler, "-fsyntax-only", *self.flags, *paths],
+                                       timeout=self.timeout)
+            fresh = self._attribute(batch, paths, res)
+            if fresh is None:               # batch verdict unusable: ask per unit
+                fresh = await asyncio.gather(*(self._aunit(sched, u) for u in batch))
+            for i, r in zip(todo, fresh):
+                results[i] = self._store(keys[i], r)
+        return results  # type: ignore[return-value]
+
+    @staticmethod
+    def _write_batch(tmp: str, units: List[Unit]) -> List[str]:
+        paths = []
+        for i, (_, code) in enumerate(units):
+            path = os.path.join(tmp, f"u{i:05d}.c")
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(code)
+            paths.append(path)
+        return paths
+
+    def _compile_batch(self, units: List[Unit]) -> Optional[List[CheckResult]]:
+        # one compiler process, one translation unit per file
+        with tempfile.TemporaryDirectory(prefix="c_compile_") as tmp:
+            paths = self._write_batch(tmp, units)
+            res = self._run(["-fsyntax-only", *self.flags, *paths])
+        return self._attribute(units, paths, res)
+
+    @staticmethod
+    def _attribute(units: List[Unit], paths: List[str], res: ExecResult) -> Optional[List[CheckResult]]:
+        """Per-unit verdicts from one batch run, or ``None`` if they cannot be told apart.
+
+        A timed-out or killed batch, or a failure whose diagnostics name none
+        of the unit files, says nothing about any single unit.
+        """
+        if res.timed_out or res.returncode < 0:
+            return None
+        if res.returncode == 0:
+            return [CheckResult(name, True) for name, _ in units]
+        errors: Dict[str, List[str]] = {p: [] for p in paths}
+        for line in res.stderr.splitlines():
+            path = line.split(":", 1)[0]
+            if path in errors:
+                errors[path].append(line)
+        if not any(errors.values()):
+            return None
+        return [CheckResult(name, not errors[p], "\n".join(errors[p]))
+                for (name, _), p in zip(units, paths)]
+
+    def check_many(self, units: Iterable[Unit], batch: int = 1) -> Iterator[CheckResult]:
+        """Check ``(name, code)`` units in parallel; results come back in order."""
+        if self.compiler is None:
+            raise RuntimeError("No C compiler found")
+        if self.engine == "async":
+            yield from self._check_many_async(units, batch)
+            return
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            if batch > 1:
+                stream = (r for rs in bounded_map(pool, self._check_batch, _chunks(units, batch),
+                                                  2 * self.jobs) for r in rs)
+            else:
+                stream = bounded_map(pool, lambda u: self.check(u[1], u[0]), units, 4 * self.jobs)
+            for res in stream:
+                self.stats.units += 1
+                self.stats.passed += res.ok
+                yield res
+
+    def _check_many_async(self, units: Iterable[Unit], batch: int) -> Iterator[CheckResult]:
+        sched = Scheduler(self.jobs)
+        if batch > 1:
+            stream = (r for rs in sched.iter_results(_chunks(units, batch),
+                                                      lambda b: self._acheck_batch(sched, b))
+                      for r in rs)
+        else:
+            stream = sched.iter_results(units, lambda u: self._acheck(sched, u))
+        for res in stream:
+            self.stats.units += 1
+            self.stats.passed += res.ok
+            yield res
+
+# ──────────────────────────────────────────────────────────────
+# CLI
+# ──────────────────────────────────────────────────────────────
+
+def iter_units(paths: Iterable[Path]) -> Iterator[Unit]:
+    """``.c`` files as-is; directories/``.jsonl`` as c_gen_adv corpus shards."""
+    for path in paths:
+        if path.is_dir():
+            yield from iter_units(sorted(path.glob("shard-*.jsonl")))
+        elif path.suffix == ".jsonl":
+            with path.open(encoding="utf-8") as fh:
+                for row in fh:
+                    rec = json.loads(row)
+                    tag = f"/{rec['variant']}" if "variant" in rec else ""
+                    yield f"{path.name}#{rec['id']}{tag}", rec["code"]
+        else:
+            yield str(path), path.read_text(encoding="utf-8")
+
+def _cli() -> None:
+    ap = argparse.ArgumentParser(description="Compile smoke-test generated C sources.")
+    ap.add_argument("paths", nargs="+", type=Path, help=".c files, shard .jsonl files or corpus dirs")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Parallel compiler runs")
+    ap.add_argument("--batch", type=int, default=1, help="Units per compiler invocation (implies -fsyntax-only)")
+    ap.add_argument("--syntax-only", action="store_true", help="Pass -fsyntax-only (no codegen/link)")
+    ap.add_argument("--quiet", action="store_true", help="Only print failures and the summary")
+    ap.add_argument("--cache", type=Path, default=DEFAULT_CACHE, help="Result cache file (SQLite)")
+    ap.add_argument("--cache-mb", type=int, default=256, help="Cache size bound in MiB")
+    ap.add_argument("--no-cache", action="store_true", help="Always invoke the compiler")
+    ap.add_argument("--engine", choices=ENGINES, default="threads",
+                    help="Thread pool, or one asyncio loop driving --jobs compilers")
+    args = ap.parse_args()
+
+    cache = None if args.no_cache else CompileCache(args.cache, args.cache_mb << 20)
+    checker = CompileChecker(jobs=args.jobs, syntax_only=args.syntax_only, cache=cache,
+                             engine=args.engine)
+    if checker.compiler is None:
+        sys.exit("✖ No C compiler found")
+    for res in checker.check_many(iter_units(args.paths), batch=args.batch):
+        if not res.ok or not args.quiet:
+            print(f"{'PASS' if res.ok else 'FAIL'} {res.name}")
+    print(f"[*] {checker.compiler}: {checker.stats.summary()}", file=sys.stderr)
+    if cache is not None:
+        print(f"[*] {cache.summary()}", file=sys.stderr)
+        cache.close()
+    sys.exit(0 if checker.stats.failed == 0 else 1)
+
+if __name__ == "__main__":
+    _cli()
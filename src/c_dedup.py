@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# c_dedup.py · v0.1.0
+"""
+Streaming exact + near-duplicate filter for task records.
+
+Highlights
+----------
+* Exact dupes: blake2b over whitespace/case-normalised question + answer,
+  remembered in a fixed-size Bloom filter (memory independent of run length)
+* Near dupes: one-permutation MinHash over token 5-gram shingles, banded LSH;
+  band keys live in a second Bloom filter, so a shared band = duplicate
+* Hashes are blake2b-derived, so results are identical across processes and
+  PYTHONHASHSEED values
+* Running dedup ratio reported every --dedup-report records
+
+Usage
+-----
+python c_dedup.py c_train.jsonl --out c_train.dedup.jsonl
+python c_task_factory_advanced.py 1000000 --seed 1 --out c_train.jsonl --dedup near
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+__version__ = "0.1.0"
+
+_WS = re.compile(r"\s+")
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_MASK64 = (1 << 64) - 1
+
+# ──────────────────────────────────────────────────────────────
+# Bloom filter
+# ──────────────────────────────────────────────────────────────
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 16-byte digests (double hashing)."""
+    __slots__ = ("bits", "size", "hashes")
+
+    def __init__(self, capacity: int, error_rate: float = 1e-4) -> None:
+        size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.size = size
+        self.hashes = max(1, round(size / capacity * math.log(2)))
+        self.bits = bytearray((size + 7) // 8)
+
+    def add(self, digest: bytes) -> bool:
+        """Insert ``digest``; return True if it was (probably) already present."""
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        bits, size = self.bits, self.size
+        present = True
+        for i in range(self.hashes):
+            pos = (h1 + i * h2) % size
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        return present
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+# ──────────────────────────────────────────────────────────────
+# Fingerprints
+# ──────────────────────────────────────────────────────────────
+
+def normalise(text: str) -> str:
+    return _WS.sub(" ", text).strip().lower()
+
+def exact_digest(rec: Dict[str, str]) -> bytes:
+    key = normalise(rec.get("question", "")) + "\0" + normalise(rec.get("answer", ""))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+def minhash(text: str, bins: int = 64, shingle: int = 5) -> List[int]:
+    """One-permutation MinHash signature (``bins`` values) of token shingles."""
+    tokens = _TOKEN.findall(text.lower())
+    sig = [_MASK64] * bins
+    for i in range(max(1, len(tokens) - shingle + 1)):
+        gram = " ".join(tokens[i:i + shingle]).encode("utf-8")
+        h = int.from_bytes(hashlib.blake2b(gram, digest_size=8).digest(), "little")
+        b, v = h % bins, h // bins
+        if v < sig[b]:
+            sig[b] = v
+    # densify: borrow from the next non-empty bin so signatures stay comparable
+    filled = [i for i, v in enumerate(sig) if v != _MASK64]
+    if filled and len(filled) < bins:
+        for i in range(bins):
+            if sig[i] == _MASK64:
+                j = next((f for f in filled if f > i), filled[0])
+                sig[i] = sig[j]
+    return sig
+
+# ──────────────────────────────────────────────────────────────
+# Deduper
+# ──────────────────────────────────────────────────────────────
+
+@dataclass
+class DedupStats:
+    seen: int = 0
+    exact: int = 0
+    near: int = 0
+
+    @property
+    def kept(self) -> int:
+        return self.seen - self.exact - self.near
+
+    @property
+    def ratio(self) -> float:
+        return (self.exact + self.near) / self.seen if self.seen else 0.0
+
+    def summary(self) -> str:
+        return (f"dedup: {self.seen:,} seen, {self.kept:,} kept, {self.exact:,} exact + "
+                f"{self.near:,} near dupes ({self.ratio:.1%} removed)")
+
+class Deduper:
+    """Drop exact (and optionally near) duplicate records from a stream.
+
+    Memory is fixed up front by ``capacity``: false positives (a unique record
+    dropped) stay around ``error_rate`` until ``capacity`` records have been kept.
+    Near dupes share a band of ``bins // bands`` MinHash rows; the Jaccard
+    similarity at which that becomes likely is about (1/bands)^(bands/bins),
+    i.e. ~0.92 with the defaults.
+    """
+
+    def __init__(self, near: bool = True, capacity: int = 10_000_000, error_rate: float = 1e-4,
+                 bins: int = 64, bands: int = 4, report_every: int = 0) -> None:
+        if bins % bands:
+            raise ValueError("bins must be a multiple of bands")
+        self.near = near
+        self.bins, self.bands, self.rows = bins, bands, bins // bands
+        self.report_every = report_every
+        self.stats = DedupStats()
+        self._exact = BloomFilter(capacity, error_rate)
+        self._bands = BloomFilter(capacity * bands, error_rate) if near else None
+
+    def is_duplicate(self, rec: Dict[str, str]) -> bool:
+        if self._exact.add(exact_digest(rec)):
+            self.stats.exact += 1
+            return True
+        if self._bands is None:
+            return False
+        sig = minhash(rec.get("question", "") + "\n" + rec.get("answer", ""), self.bins)
+        hit = False
+        for b in range(self.bands):
+            band = sig[b * self.rows:(b + 1) * self.rows]
+            key = hashlib.blake2b(repr((b, band)).encode(), digest_size=16).digest()
+            hit |= self._bands.add(key)
+        if hit:
+            self.stats.near += 1
+        return hit
+
+    def filter(self, records: Iterable[Dict[str, str]]) -> Iterator[Dict[str, str]]:
+        for rec in records:
+            self.stats.seen += 1
+            if not self.is_duplicate(rec):
+                yield rec
+            if self.report_every and self.stats.seen % self.report_every == 0:
+                print(f"[*] {self.stats.summary()}", file=sys.stderr)
+
+    @property
+    def nbytes(self) -> int:
+        return self._exact.nbytes + (self._bands.nbytes if self._bands else 0)
+
+def add_dedup_args(ap: argparse.ArgumentParser, switch: bool = True) -> None:
+    """The --dedup option group shared by the task-factory CLIs."""
+    g = ap.add_argument_group("deduplication")
+    if switch:
+        g.add_argument("--dedup", choices=["off", "exact", "near"], default="off",
+                       help="Drop exact, or exact + near-duplicate records")
+    g.add_argument("--dedup-capacity", type=int, default=10_000_000,
+                   help="Expected unique records (sizes the Bloom filters)")
+    g.add_argument("--dedup-bands", type=int, default=4,
+                   help="LSH bands over 64 MinHash bins; more bands = looser near-dup threshold")
+    g.add_argument("--dedup-report", type=int, default=100_000,
+                   help="Print the running dedup ratio every N records (0 = only at the end)")
+
+def deduper_from_args(args: argparse.Namespace) -> Deduper:
+    return Deduper(near=args.dedup == "near", capacity=args.dedup_capacity,
+                   bands=args.dedup_bands, report_every=args.dedup_report)
+
+# ──────────────────────────────────────────────────────────────
+# CLI
+# ──────────────────────────────────────────────────────────────
+
+def _cli() -> None:
+    ap = argparse.ArgumentParser(description="Deduplicate a C task JSONL file.")
+    ap.add_argument("src", type=Path, help="Input JSONL")
+    ap.add_argument("--out", type=Path, help="Deduplicated JSONL (default: stdout)")
+    ap.add_argument("--exact-only", action="store_true", help="Skip near-duplicate detection")
+    add_dedup_args(ap, switch=False)
+    args = ap.parse_args()
+    args.dedup = "exact" if args.exact_only else "near"
+
+    deduper = deduper_from_args(args)
+    sink = args.out.open("w", encoding="utf-8") if args.out else sys.stdout
+    with args.src.open(encoding="utf-8") as fh:
+        for rec in deduper.filter(json.loads(line) for line in fh):
+            json.dump(rec, sink, ensure_ascii=False)
+            sink.write("\n")
+    if args.out:
+        sink.close()
+    print(f"[*] {deduper.stats.summary()}", file=sys.stderr)
+
+if __name__ == "__main__":
+    _cli()
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-# synthetic_c.py · v0.1.0
+# synthetic_c.py · v0.1.1
 """
 Generate synthetic—yet syntactically valid—C source files.
 
@@ -8,7 +8,12 @@ Major features
 * Deterministic output with --seed
 * Plugin architecture for new snippet generators
 * Tracks typedefs and structs to reference in functions
-* --out to save directly to disk
+* --out to save directly to disk (streamed, constant memory)
+* --sampler table for a precomputed, batched construct sampler; --sampler
+  adaptive also masks exhausted generators (main, func_def) so no draw is wasted
+* Fast bulk identifier draws, optionally unique per file (--unique-names)
+* --rng numpy: optional NumPy block pre-draws behind ``state["rng"]`` (c_rng.py)
+* --profile for per-generator call/time/line/empty-return counters
 
 Usage
 -----
@@ -22,14 +27,22 @@ import random
 import sys
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Callable, Dict, List, Optional, Set, Tuple
+from typing import Callable, Dict, Iterator, Optional
 
-__version__ = "0.1.0"
+from c_gen_core import (LETTERS, AdaptiveSampler, GenProfile, NameGen, ReadyFn, SymbolTable,
+                        pick_from, weighted_sampler)
+from c_rng import HAVE_NUMPY, RNG_KINDS, make_rng
+
+__version__ = "0.1.1"
 
 @dataclass(frozen=True)
 class CConfig:
     loc: int = 200                 # approximate number of lines
     seed: Optional[int] = None
+    sampler: str = "choices"       # choices|table|adaptive
+    names: str = "fast"            # fast|legacy identifier draws
+    unique_names: bool = False     # never reuse an identifier within a file
+    rng: str = "python"            # python|numpy provider for state["rng"]
     weights: Dict[str, float] = field(default_factory=lambda: {
         "comment":       0.10,
         "include":       0.10,
@@ -46,25 +59,26 @@ class CConfig:
 
 GeneratorFn = Callable[[Dict], str]
 _REGISTRY: Dict[str, GeneratorFn] = {}
+_READY: Dict[str, ReadyFn] = {}    # preconditions; kind is skipped while False
 
-def register(kind: str) -> Callable[[GeneratorFn], GeneratorFn]:
+def register(kind: str, ready: Optional[ReadyFn] = None) -> Callable[[GeneratorFn], GeneratorFn]:
     def inner(fn: GeneratorFn) -> GeneratorFn:
         if kind in _REGISTRY:
             raise ValueError(f"Duplicate generator: {kind}")
         _REGISTRY[kind] = fn
+        if ready is not None:
+            _READY[kind] = ready
         return fn
     return inner
 
+PROFILE: Optional[GenProfile] = None
+
 # ──────────────────────────────────────────────────────────────
 # Helpers
 # ──────────────────────────────────────────────────────────────
 
-LETTERS = "abcdefghijklmnopqrstuvwxyz"
 C_TYPES = ["int", "long", "float", "double", "char"]
 
-def fresh_name(rng: random.Random, length: int = 6) -> str:
-    return "".join(rng.choice(LETTERS) for _ in range(length))
-
 def random_value(rng: random.Random, ctype: str) -> str:
     if ctype == "char":
         return f"'{rng.choice(LETTERS)}'"
@@ -81,8 +95,9 @@ def random_value(rng: random.Random, ctype: str) -> str:
 @register("comment")
 def gen_comment(state: Dict) -> str:
     rng = state["rng"]
+    names = state["names"]
     tags = ["// TODO", "// FIXME", "// NOTE", "// HACK"]
-    text = fresh_name(rng, rng.randint(3,8))
+    text = names(rng.randint(3,8), unique=False)
     return f"{rng.choice(tags)}: {text}\n"
 
 @register("include")
@@ -94,27 +109,30 @@ def gen_include(state: Dict) -> str:
 @register("define_macro")
 def gen_define_macro(state: Dict) -> str:
     rng = state["rng"]
-    name = fresh_name(rng).upper()
+    names = state["names"]
+    name = names().upper()
     val = rng.randint(1, 100)
     return f"#define {name} {val}\n"
 
 @register("typedef")
 def gen_typedef(state: Dict) -> str:
     rng = state["rng"]
+    names = state["names"]
     base = rng.choice(C_TYPES)
-    alias = fresh_name(rng, rng.randint(3,6))
+    alias = names(rng.randint(3,6))
     state["typedefs"].add(alias)
     return f"typedef {base} {alias};\n"
 
 @register("struct")
 def gen_struct(state: Dict) -> str:
     rng = state["rng"]
-    name = fresh_name(rng, rng.randint(3,6)).capitalize()
+    names = state["names"]
+    name = names(rng.randint(3,6)).capitalize()
     field_count = rng.randint(1,3)
     fields = []
     for _ in range(field_count):
         t = rng.choice(C_TYPES)
-        fn = fresh_name(rng, rng.randint(3,6))
+        fn = names(rng.randint(3,6))
         fields.append(f"    {t} {fn};")
     state["structs"].add(name)
     body = "\n".join(fields)
@@ -123,10 +141,10 @@ def gen_struct(state: Dict) -> str:
 @register("var_decl")
 def gen_var_decl(state: Dict) -> str:
     rng = state["rng"]
+    names = state["names"]
     # choose a type from basic or typedefs or structs
-    types = C_TYPES + list(state["typedefs"]) + list(state["structs"])
-    ctype = rng.choice(types)
-    name = fresh_name(rng)
+    ctype = pick_from(rng, C_TYPES, state["typedefs"], state["structs"])
+    name = names()
     val = random_value(rng, rng.choice(C_TYPES)) if rng.random() < 0.5 else ""
     init = f" = {val}" if val else ""
     return f"{ctype} {name}{init};\n"
@@ -134,25 +152,26 @@ def gen_var_decl(state: Dict) -> str:
 @register("func_decl")
 def gen_func_decl(state: Dict) -> str:
     rng = state["rng"]
-    ret = rng.choice(C_TYPES + list(state["typedefs"]))
-    name = fresh_name(rng)
+    names = state["names"]
+    ret = pick_from(rng, C_TYPES, state["typedefs"])
+    name = names()
     # parameters
     n = rng.randint(0,2)
     params = []
     for _ in range(n):
-        ptype = rng.choice(C_TYPES + list(state["typedefs"]))
-        pname = fresh_name(rng)
+        ptype = pick_from(rng, C_TYPES, state["typedefs"])
+        pname = names()
         params.append(f"{ptype} {pname}")
     params_str = ", ".join(params) if params else "void"
     state["funcs"].add((ret, name, params_str))
     return f"{ret} {name}({params_str});\n"
 
-@register("func_def")
+@register("func_def", ready=lambda state: bool(state["funcs"]))
 def gen_func_def(state: Dict) -> str:
     rng = state["rng"]
     if not state["funcs"]:
         return ""
-    ret, name, params_str = rng.choice(list(state["funcs"]))
+    ret, name, params_str = state["funcs"].pick(rng)
     lines = [f"{ret} {name}({params_str}) {{\n"]
     # simple body: return or variable
     if ret != "void":
@@ -163,7 +182,7 @@ def gen_func_def(state: Dict) -> str:
     lines.append("}\n\n")
     return "".join(lines)
 
-@register("main")
+@register("main", ready=lambda state: not state["main_written"])
 def gen_main(state: Dict) -> str:
     if state["main_written"]:
         return ""
@@ -173,7 +192,7 @@ def gen_main(state: Dict) -> str:
     rng = state["rng"]
     for _ in range(rng.randint(1,3)):
         if state["funcs"] and rng.random() < 0.5:
-            _, fname, pstr = rng.choice(list(state["funcs"]))
+            _, fname, pstr = state["funcs"].pick(rng)
             args = ", ".join("0" for _ in pstr.split(",")) if pstr != "void" else ""
             lines.append(f"    {fname}({args});\n")
         else:
@@ -186,7 +205,8 @@ def gen_main(state: Dict) -> str:
 @register("conditional")
 def gen_conditional(state: Dict) -> str:
     rng = state["rng"]
-    var = fresh_name(rng)
+    names = state["names"]
+    var = names()
     cmp_val = rng.randint(0,10)
     return (
         f"if ({var} > {cmp_val}) {{\n"
@@ -199,7 +219,8 @@ def gen_conditional(state: Dict) -> str:
 @register("loop")
 def gen_loop(state: Dict) -> str:
     rng = state["rng"]
-    var = fresh_name(rng)
+    names = state["names"]
+    var = names()
     count = rng.randint(1,5)
     return (
         f"for (int {var} = 0; {var} < {count}; ++{var}) {{\n"
@@ -211,48 +232,94 @@ def gen_loop(state: Dict) -> str:
 # Build & CLI
 # ──────────────────────────────────────────────────────────────
 
-def build_c(cfg: CConfig) -> str:
-    rng = random.Random(cfg.seed)
-    state = {
+def _kind_drawer(cfg: CConfig, rng: random.Random, state: Dict) -> Callable[[], str]:
+    if cfg.sampler == "adaptive":
+        return AdaptiveSampler(cfg.weights, _READY, state, random.Random(rng.getrandbits(64)))
+    if cfg.sampler == "table":
+        # own stream so the batch size never shifts the generators' draws
+        return weighted_sampler(cfg.weights).stream(random.Random(rng.getrandbits(64))).__next__
+    kinds, weights = zip(*cfg.weights.items())
+    return lambda: rng.choices(kinds, weights=weights, k=1)[0]
+
+def new_state(cfg: CConfig, rng: random.Random) -> Dict:
+    """Fresh generator state for one file."""
+    return {
         "rng": rng,
-        "typedefs": set(),     # alias names
-        "structs": set(),      # struct names
-        "funcs": set(),        # (ret, name, params)
+        "names": NameGen(rng, cfg.names, cfg.unique_names),
+        "typedefs": SymbolTable(),     # alias names
+        "structs": SymbolTable(),      # struct names
+        "funcs": SymbolTable(),        # (ret, name, params)
         "main_written": False,
     }
-    parts: List[str] = ["/* Auto-generated C code */\n\n"]
-    lines = parts[0].count("\n")
-    kinds, weights = zip(*cfg.weights.items())
+
+def iter_c(cfg: CConfig) -> Iterator[str]:
+    """Yield the generated file snippet by snippet (constant memory in ``loc``)."""
+    rng = make_rng(cfg.rng, cfg.seed)
+    state = new_state(cfg, rng)
+    header = "/* Auto-generated C code */\n\n"
+    yield header
+    lines = header.count("\n")
+    next_kind = _kind_drawer(cfg, rng, state)
+    registry = PROFILE.wrap(_REGISTRY) if PROFILE is not None else _REGISTRY
 
     while lines < cfg.loc:
-        kind = rng.choices(kinds, weights=weights, k=1)[0]
-        snippet = _REGISTRY[kind](state)
+        kind = next_kind()
+        snippet = registry[kind](state)
         if not snippet:
             continue
-        parts.append(snippet)
+        yield snippet
         lines += snippet.count("\n")
 
     # ensure main exists
     if not state["main_written"]:
-        parts.append(gen_main(state))
-    return "".join(parts)
+        yield registry["main"](state)
+
+def build_c(cfg: CConfig) -> str:
+    return "".join(iter_c(cfg))
+
+def write_c(cfg: CConfig, path: Path, buffering: int = 1 << 20) -> None:
+    """Stream ``iter_c`` straight to ``path`` through a large write buffer."""
+    with path.open("w", encoding="utf-8", buffering=buffering) as fh:
+        for chunk in iter_c(cfg):
+            fh.write(chunk)
 
 def _cli() -> None:
     p = argparse.ArgumentParser(description="Generate a synthetic C source file.")
     p.add_argument("loc", nargs="?", type=int, default=200, help="Approx. number of lines")
     p.add_argument("--seed", type=int, help="Random seed")
     p.add_argument("--out", type=Path, help="Path to save generated .c")
+    p.add_argument("--sampler", choices=["choices", "table", "adaptive"], default="choices",
+                   help="Construct sampler: per-draw rng.choices, batched cumulative table, "
+                        "or table that masks generators whose precondition fails")
+    p.add_argument("--names", choices=["fast", "legacy"], default="fast",
+                   help="Identifier draws: bulk base-26 (fast) or per-letter (legacy; the draws "
+                        "before the fast path, not a past release's output)")
+    p.add_argument("--unique-names", action="store_true",
+                   help="Never emit the same identifier twice in a file")
+    p.add_argument("--rng", choices=RNG_KINDS, default="python",
+                   help="state['rng'] provider: random.Random, or block pre-draws via NumPy "
+                        "(own stream: different files for the same seed)")
+    p.add_argument("--profile", action="store_true",
+                   help="Print per-generator calls/time/lines/empty returns to stderr")
     args = p.parse_args()
+    if args.rng == "numpy" and not HAVE_NUMPY:
+        p.error("--rng numpy needs the 'numpy' package")
 
-    cfg = CConfig(loc=args.loc, seed=args.seed)
-    code = build_c(cfg)
+    cfg = CConfig(loc=args.loc, seed=args.seed, sampler=args.sampler,
+                  names=args.names, unique_names=args.unique_names, rng=args.rng)
+    if args.profile:
+        global PROFILE
+        PROFILE = GenProfile()
 
     if args.out:
         args.out.parent.mkdir(parents=True, exist_ok=True)
-        args.out.write_text(code, encoding="utf-8")
+        write_c(cfg, args.out)
         print(f"✔ Saved generated C code to {args.out}")
     else:
-        sys.stdout.write(code)
+        sys.stdout.writelines(iter_c(cfg))
+
+    if PROFILE is not None:
+        print(PROFILE.table(), file=sys.stderr)
 
 if __name__ == "__main__":
     _cli()
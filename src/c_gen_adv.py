@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-# c_gen.py · v0.2.1
+# c_gen.py · v0.2.2
 """
 Generate synthetic—yet *compilable-ish*—C source files for LM pre-training.
 
@@ -8,25 +8,51 @@ Highlights
 * Deterministic output with --seed
 * Rich C surface: enums, unions, pointers, switch, function-like macros
 * Per-file style randomisation (K&R / Allman / GNU)
+* Generators emit a small IR (``Line``/``Block`` nodes with ``__slots__``);
+  ``build_program`` generates once, ``Program.render`` renders any style
 * --weights to tweak construct distribution on the fly
 * Optional --check to run a compile smoke-test (gcc/clang)
+* --sampler table for a precomputed, batched construct sampler; --sampler
+  adaptive also masks exhausted generators (main, func_def) so no draw is wasted
+* Fast bulk identifier draws, optionally unique per file (--unique-names)
+* --rng numpy: optional NumPy block pre-draws behind ``state["rng"]`` (c_rng.py)
+* --profile for per-generator call/time/line/empty-return counters
+* --files/--jobs/--out-dir corpus mode: sharded JSONL + manifest over a process pool
+* --budget-bytes / --budget-tokens: stop at a byte (≈token) budget, per file or
+  for a whole corpus planned into shards of --shard-bytes; sizes come from
+  running per-node counters on the IR, never from rescanning text
+* --variants: one generation per file, one row per style / renamed / comment-free
+  variant, with per-variant throughput in the manifest
 
 Usage
 -----
 python c_gen.py 300
 python c_gen.py 400 --seed 123 --style allman --weights switch=0.08,enum=0.05 --check
+python c_gen.py 300 --seed 7 --files 100000 --jobs 8 --out-dir corpus/
+python c_gen.py 300 --seed 7 --out-dir corpus/ --budget-tokens 500000000 --shard-bytes 67108864
+python c_gen.py 300 --seed 7 --files 10000 --out-dir aug/ --variants kr,allman,gnu,rename,kr+strip
 """
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
 import random
-import subprocess
+import re
 import sys
-from dataclasses import dataclass, field
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-__version__ = "0.2.1"
+from c_compile import ENGINES, CompileCache, CompileChecker, iter_units
+from c_gen_core import (C_KEYWORDS, LETTERS, AdaptiveSampler, GenProfile, NameGen, ReadyFn,
+                        SymbolTable, pick_from, weighted_sampler)
+from c_rng import HAVE_NUMPY, RNG_KINDS, make_rng, rng_version
+
+__version__ = "0.2.2"
 
 # ──────────────────────────────────────────────────────────────
 # Config & registry
@@ -38,6 +64,11 @@ class CConfig:
     seed: Optional[int] = None
     style: str = "auto"          # auto|kr|allman|gnu
     check: bool = False
+    sampler: str = "choices"     # choices|table|adaptive
+    names: str = "fast"          # fast|legacy identifier draws
+    unique_names: bool = False   # never reuse an identifier within a file
+    rng: str = "python"          # python|numpy provider for state["rng"]
+    max_bytes: Optional[int] = None  # byte budget per file instead of loc (IR path)
     weights: Dict[str, float] = field(default_factory=lambda: {
         "comment":        0.07,
         "include":        0.07,
@@ -57,21 +88,29 @@ class CConfig:
     })
 
 GeneratorFn = Callable[[Dict], str]
-_REGISTRY: Dict[str, GeneratorFn] = {}
+IRGeneratorFn = Callable[[Dict], List]      # -> Snippet (list of Line/Block)
+_REGISTRY: Dict[str, GeneratorFn] = {}      # rendered in the file's style
+_IR_REGISTRY: Dict[str, IRGeneratorFn] = {}
+_READY: Dict[str, ReadyFn] = {}    # preconditions; kind is skipped while False
 
-def register(kind: str) -> Callable[[GeneratorFn], GeneratorFn]:
-    def inner(fn: GeneratorFn) -> GeneratorFn:
+def register(kind: str, ready: Optional[ReadyFn] = None) -> Callable[[IRGeneratorFn], IRGeneratorFn]:
+    """Register an IR generator; ``_REGISTRY`` gets a wrapper rendering it in the file's style."""
+    def inner(fn: IRGeneratorFn) -> IRGeneratorFn:
         if kind in _REGISTRY:
             raise ValueError(f"Duplicate generator: {kind}")
-        _REGISTRY[kind] = fn
+        _IR_REGISTRY[kind] = fn
+        _REGISTRY[kind] = lambda state: render(fn(state), state["style"])
+        if ready is not None:
+            _READY[kind] = ready
         return fn
     return inner
 
+PROFILE: Optional[GenProfile] = None
+
 # ──────────────────────────────────────────────────────────────
 # Helpers
 # ──────────────────────────────────────────────────────────────
 
-LETTERS = "abcdefghijklmnopqrstuvwxyz"
 BASE_CTYPES = ["int", "long", "float", "double", "char"]
 POINTER_CHANCE = 0.25           # probability a type is emitted as a pointer
 
@@ -81,11 +120,8 @@ STYLE_TABLE = {
     "gnu":    {"indent": "  ",   "brace_same": True},
 }
 
-def fresh_name(rng: random.Random, length: int = 6) -> str:
-    return "".join(rng.choice(LETTERS) for _ in range(length))
-
-def choose_ctype(rng: random.Random, extra: List[str]) -> str:
-    base = rng.choice(BASE_CTYPES + extra)
+def choose_ctype(rng: random.Random, extra: Sequence[str]) -> str:
+    base = pick_from(rng, BASE_CTYPES, extra)
     if rng.random() < POINTER_CHANCE and not base.endswith("*"):
         return base + "*"
     return base
@@ -100,11 +136,65 @@ def random_value(rng: random.Random, ctype: str) -> str:
         return f"{v}{'L' if ctype == 'long' else ''}"
     return f"{rng.uniform(0, 100):.2f}"
 
-def brace_line(state: Dict, header: str) -> str:
-    style = state["style"]
-    if STYLE_TABLE[style]["brace_same"]:
-        return f"{header} {{\n"
-    return f"{header}\n{{\n"
+# ──────────────────────────────────────────────────────────────
+# IR
+# ──────────────────────────────────────────────────────────────
+
+class Line:
+    """One source line, ``depth`` block levels deep (the style picks the indent).
+
+    ``idents`` are the identifiers this line introduced (drawn from ``NameGen``),
+    so variants can rename them; ``comment`` lines can be stripped.
+    """
+    __slots__ = ("text", "depth", "comment", "idents")
+
+    def __init__(self, text: str, depth: int = 0, comment: bool = False,
+                 idents: Tuple[str, ...] = ()) -> None:
+        self.text = text
+        self.depth = depth
+        self.comment = comment
+        self.idents = idents
+
+class Block:
+    """``head {`` body ``}tail`` — one scope.
+
+    ``styled`` blocks follow the file's brace style; aggregate bodies
+    (struct/union) are always written ``head {`` with 4-space fields.
+    """
+    __slots__ = ("head", "body", "tail", "styled", "idents")
+
+    def __init__(self, head: str, body: List[Line], tail: str = "", styled: bool = True,
+                 idents: Tuple[str, ...] = ()) -> None:
+        self.head = head
+        self.body = body
+        self.tail = tail
+        self.styled = styled
+        self.idents = idents
+
+Node = object                    # Line | Block
+Snippet = List[Node]             # what one generator call returns
+
+def render_into(out: List[str], nodes: Iterable[Node], style: str,
+                strip_comments: bool = False) -> None:
+    """Append the source text of ``nodes`` in ``style`` to ``out`` (one pass)."""
+    indent = STYLE_TABLE[style]["indent"]
+    same = STYLE_TABLE[style]["brace_same"]
+    emit = out.append
+    for node in nodes:
+        if node.__class__ is Line:
+            if not (strip_comments and node.comment):
+                emit(indent * node.depth + node.text + "\n")
+            continue
+        emit(node.head + (" {\n" if same or not node.styled else "\n{\n"))
+        for line in node.body:
+            if not (strip_comments and line.comment):
+                emit(indent * line.depth + line.text + "\n")
+        emit("}" + node.tail + "\n")
+
+def render(nodes: Iterable[Node], style: str, strip_comments: bool = False) -> str:
+    out: List[str] = []
+    render_into(out, nodes, style, strip_comments)
+    return "".join(out)
 
 # ──────────────────────────────────────────────────────────────
 # Generators
@@ -113,8 +203,9 @@ def brace_line(state: Dict, header: str) -> str:
 @register("comment")
 def gen_comment(state):
     rng = state["rng"]
+    names = state["names"]
     tags = ["// TODO", "// FIXME", "// NOTE", "// HACK"]
-    return f"{rng.choice(tags)}: {fresh_name(rng, rng.randint(3, 8))}\n"
+    return [Line(f"{rng.choice(tags)}: {names(rng.randint(3, 8), unique=False)}", comment=True)]
 
 @register("include")
 def gen_include(state):
@@ -127,180 +218,699 @@ def gen_include(state):
         available = hdrs
     hdr = rng.choice(available)
     state["headers"].add(hdr)
-    return f"#include {hdr}\n"
+    return [Line(f"#include {hdr}")]
 
 @register("define_macro")
 def gen_define_macro(state):
     rng = state["rng"]
-    name = fresh_name(rng).upper()
-    return f"#define {name} {rng.randint(1, 100)}\n"
+    names = state["names"]
+    name = names().upper()
+    return [Line(f"#define {name} {rng.randint(1, 100)}", idents=(name,))]
 
 @register("define_macro_f")
 def gen_define_macro_func(state):
-    rng = state["rng"]
-    name = fresh_name(rng).upper()
-    param = fresh_name(rng, 1)
-    return f"#define {name}({param}) (({param}) * ({param}))\n"
+    names = state["names"]
+    name = names().upper()
+    param = names(1, unique=False)
+    return [Line(f"#define {name}({param}) (({param}) * ({param}))", idents=(name, param))]
 
 @register("typedef")
 def gen_typedef(state):
     rng = state["rng"]
-    alias = fresh_name(rng, rng.randint(3, 6))
+    names = state["names"]
+    alias = names(rng.randint(3, 6))
     state["typedefs"].add(alias)
-    return f"typedef {rng.choice(BASE_CTYPES)} {alias};\n"
+    return [Line(f"typedef {rng.choice(BASE_CTYPES)} {alias};", idents=(alias,))]
 
 @register("enum")
 def gen_enum(state):
     rng = state["rng"]
-    name = fresh_name(rng, rng.randint(3, 6)).capitalize()
-    items = ", ".join(f"{name.upper()}_{i}" for i in range(rng.randint(2, 4)))
+    names = state["names"]
+    name = names(rng.randint(3, 6)).capitalize()
+    items = [f"{name.upper()}_{i}" for i in range(rng.randint(2, 4))]
     state["typedefs"].add(name)
-    return f"typedef enum {{ {items} }} {name};\n"
+    return [Line(f"typedef enum {{ {', '.join(items)} }} {name};", idents=(name, *items))]
 
 @register("union")
 def gen_union(state):
     rng = state["rng"]
-    name = fresh_name(rng, rng.randint(3, 6)).capitalize()
-    fields = [f"    {t} {fresh_name(rng)};" for t in rng.sample(BASE_CTYPES, 2)]
+    names = state["names"]
+    name = names(rng.randint(3, 6)).capitalize()
+    fields = [(t, names()) for t in rng.sample(BASE_CTYPES, 2)]
     state["structs"].add(name)
-    return f"typedef union {name} {{\n" + "\n".join(fields) + f"\n}} {name};\n"
+    body = [Line(f"    {t} {f};") for t, f in fields]
+    return [Block(f"typedef union {name}", body, f" {name};", styled=False,
+                  idents=(name, *(f for _, f in fields)))]
 
 @register("struct")
 def gen_struct(state):
     rng = state["rng"]
-    name = fresh_name(rng, rng.randint(3, 6)).capitalize()
-    lines = [
-        f"    {rng.choice(BASE_CTYPES)} {fresh_name(rng, rng.randint(3, 6))};"
+    names = state["names"]
+    name = names(rng.randint(3, 6)).capitalize()
+    fields = [
+        (rng.choice(BASE_CTYPES), names(rng.randint(3, 6)))
         for _ in range(rng.randint(1, 3))
     ]
     state["structs"].add(name)
-    return f"typedef struct {name} {{\n" + "\n".join(lines) + f"\n}} {name};\n"
+    body = [Line(f"    {t} {f};") for t, f in fields]
+    return [Block(f"typedef struct {name}", body, f" {name};", styled=False,
+                  idents=(name, *(f for _, f in fields)))]
 
 @register("var_decl")
 def gen_var_decl(state):
     rng = state["rng"]
-    ctype = choose_ctype(rng, list(state["typedefs"]))
-    name = fresh_name(rng)
+    names = state["names"]
+    ctype = choose_ctype(rng, state["typedefs"])
+    name = names()
     init = ""
     if not ctype.endswith("*") and rng.random() < 0.5:
         init = f" = {random_value(rng, rng.choice(BASE_CTYPES))}"
-    return f"{ctype} {name}{init};\n"
+    return [Line(f"{ctype} {name}{init};", idents=(name,))]
 
 @register("func_decl")
 def gen_func_decl(state):
     rng = state["rng"]
-    ret = choose_ctype(rng, list(state["typedefs"]))
-    name = fresh_name(rng)
+    names = state["names"]
+    ret = choose_ctype(rng, state["typedefs"])
+    name = names()
     params = [
-        f"{choose_ctype(rng, list(state['typedefs']))} {fresh_name(rng)}"
+        (choose_ctype(rng, state['typedefs']), names())
         for _ in range(rng.randint(0, 2))
     ]
-    params_str = ", ".join(params) if params else "void"
+    params_str = ", ".join(f"{t} {p}" for t, p in params) if params else "void"
     state["funcs"].add((ret, name, params_str))
-    return f"{ret} {name}({params_str});\n"
+    return [Line(f"{ret} {name}({params_str});", idents=(name, *(p for _, p in params)))]
 
-@register("func_def")
+@register("func_def", ready=lambda state: bool(state["funcs"]))
 def gen_func_def(state):
     rng = state["rng"]
     if not state["funcs"]:
-        return ""
-    ret, name, params_str = rng.choice(list(state["funcs"]))
-    indent = STYLE_TABLE[state["style"]]["indent"]
-    body = f"{indent}// function body\n" if ret == "void" else f"{indent}return {random_value(rng, rng.choice(BASE_CTYPES))};\n"
-    return brace_line(state, f"{ret} {name}({params_str})") + body + "}\n\n"
+        return []
+    ret, name, params_str = state["funcs"].pick(rng)
+    if ret == "void":
+        body = Line("// function body", 1, comment=True)
+    else:
+        body = Line(f"return {random_value(rng, rng.choice(BASE_CTYPES))};", 1)
+    return [Block(f"{ret} {name}({params_str})", [body]), Line("")]
 
 @register("switch")
 def gen_switch(state):
     rng = state["rng"]
-    var = fresh_name(rng)
-    indent = STYLE_TABLE[state["style"]]["indent"]
-    cases = [
-        f"{indent}case {i}:\n{indent*2}{var} += {i};\n{indent*2}break;\n"
-        for i in range(rng.randint(2, 4))
-    ]
-    default = f"{indent}default:\n{indent*2}break;\n}}\n"
-    return brace_line(state, f"switch ({var})") + "".join(cases) + default
+    names = state["names"]
+    var = names()
+    body = []
+    for i in range(rng.randint(2, 4)):
+        body += [Line(f"case {i}:", 1), Line(f"{var} += {i};", 2), Line("break;", 2)]
+    body += [Line("default:", 1), Line("break;", 2)]
+    return [Block(f"switch ({var})", body, idents=(var,))]
 
 @register("conditional")
 def gen_conditional(state):
     rng = state["rng"]
-    var = fresh_name(rng)
+    names = state["names"]
+    var = names()
     cmp_val = rng.randint(0, 10)
-    indent = STYLE_TABLE[state["style"]]["indent"]
-    part1 = brace_line(state, f"if ({var} > {cmp_val})") + f"{indent}{var} = {cmp_val};\n}}\n"
-    part2 = brace_line(state, f"else") + f"{indent}{var} += {cmp_val};\n}}\n"
-    return part1 + part2
+    return [Block(f"if ({var} > {cmp_val})", [Line(f"{var} = {cmp_val};", 1)], idents=(var,)),
+            Block("else", [Line(f"{var} += {cmp_val};", 1)])]
 
 @register("loop")
 def gen_loop(state):
     rng = state["rng"]
-    var = fresh_name(rng)
-    indent = STYLE_TABLE[state["style"]]["indent"]
-    return brace_line(state, f"for (int {var} = 0; {var} < {rng.randint(1,5)}; ++{var})") + f"{indent}// loop body\n}}\n"
+    names = state["names"]
+    var = names()
+    head = f"for (int {var} = 0; {var} < {rng.randint(1,5)}; ++{var})"
+    return [Block(head, [Line("// loop body", 1, comment=True)], idents=(var,))]
 
-@register("main")
+@register("main", ready=lambda state: not state["main_written"])
 def gen_main(state):
     if state["main_written"]:
-        return ""
+        return []
     state["main_written"] = True
     rng = state["rng"]
-    indent = STYLE_TABLE[state["style"]]["indent"]
     body = []
     for _ in range(rng.randint(1, 3)):
         if state["funcs"] and rng.random() < 0.5:
-            _, fname, pstr = rng.choice(list(state["funcs"]))
+            _, fname, pstr = state["funcs"].pick(rng)
             args = ", ".join("0" for _ in pstr.split(",")) if pstr != "void" else ""
-            body.append(f"{indent}{fname}({args});\n")
+            body.append(Line(f"{fname}({args});", 1))
         else:
-            body.append(f'{indent}printf("Hello, world!\\n");\n')
-    body.append(f"{indent}return 0;\n")
-    return brace_line(state, "int main(void)") + "".join(body) + "}\n"
+            body.append(Line('printf("Hello, world!\\n");', 1))
+    body.append(Line("return 0;", 1))
+    return [Block("int main(void)", body)]
 
 # ──────────────────────────────────────────────────────────────
 # Builder
 # ──────────────────────────────────────────────────────────────
 
-def build_c(cfg: CConfig) -> str:
-    rng = random.Random(cfg.seed)
+def _kind_drawer(cfg: CConfig, rng: random.Random, state: Dict) -> Callable[[], str]:
+    if cfg.sampler == "adaptive":
+        return AdaptiveSampler(cfg.weights, _READY, state, random.Random(rng.getrandbits(64)))
+    if cfg.sampler == "table":
+        # own stream so the batch size never shifts the generators' draws
+        return weighted_sampler(cfg.weights).stream(random.Random(rng.getrandbits(64))).__next__
+    kinds, weights = zip(*cfg.weights.items())
+    return lambda: rng.choices(kinds, weights=weights)[0]
+
+def new_state(cfg: CConfig, rng: random.Random) -> Dict:
+    """Fresh generator state for one file."""
     style = rng.choice(list(STYLE_TABLE.keys())) if cfg.style == "auto" else cfg.style
-    state = {
+    return {
         "rng": rng,
+        "names": NameGen(rng, cfg.names, cfg.unique_names),
         "style": style,
-        "typedefs": set(),
-        "structs": set(),
-        "funcs": set(),
+        "typedefs": SymbolTable(),
+        "structs": SymbolTable(),
+        "funcs": SymbolTable(),
         "headers": set(),
         "main_written": False,
     }
 
-    parts = ["/* Auto-generated C code */\n\n"]
-    lines = parts[0].count("\n")
-    kinds, weights = zip(*cfg.weights.items())
+def iter_c(cfg: CConfig) -> Iterator[str]:
+    """Yield the generated file snippet by snippet (constant memory in ``loc``)."""
+    if cfg.max_bytes is not None:       # byte budgets are kept on the IR
+        yield build_program(cfg).render()
+        return
+    rng = make_rng(cfg.rng, cfg.seed)
+    state = new_state(cfg, rng)
+
+    header = "/* Auto-generated C code */\n\n"
+    yield header
+    lines = header.count("\n")
+    next_kind = _kind_drawer(cfg, rng, state)
+    registry = PROFILE.wrap(_REGISTRY) if PROFILE is not None else _REGISTRY
 
     while lines < cfg.loc:
-        snippet = _REGISTRY[rng.choices(kinds, weights=weights)[0]](state)
+        snippet = registry[next_kind()](state)
         if snippet:
-            parts.append(snippet)
+            yield snippet
             lines += snippet.count("\n")
 
     if not state["main_written"]:
-        parts.append(gen_main(state))
+        yield registry["main"](state)
+
+def build_c(cfg: CConfig) -> str:
+    return "".join(iter_c(cfg))
+
+def _line_count(nodes: Snippet, same: bool) -> int:
+    n = 0
+    for node in nodes:
+        if node.__class__ is Line:
+            n += 1
+        else:
+            n += len(node.body) + (2 if same or not node.styled else 3)
+    return n
+
+def _byte_count(nodes: Snippet, indent: int, same: bool) -> int:
+    """Rendered size from the node texts (generated C is ASCII: chars == bytes)."""
+    n = 0
+    for node in nodes:
+        if node.__class__ is Line:
+            n += indent * node.depth + len(node.text) + 1
+        else:
+            n += len(node.head) + len(node.tail) + 5      # " {\n" or "\n{\n", then "}\n"
+            for line in node.body:
+                n += indent * line.depth + len(line.text) + 1
+    return n
+
+FILL_TRIES = 8                  # redraws for a snippet that still fits the byte budget
+# not comment=True: the file header survives "strip" variants
+_HEADER: Snippet = [Line("/* Auto-generated C code */"), Line("")]
+_MIN_MAIN: Snippet = [Block("int main(void)", [Line("return 0;", 1)])]
+_SYMBOLS = ("typedefs", "structs", "funcs")
+
+def _mark(state: Dict) -> Tuple:
+    # headers is a handful of names, and "include" may clear it, so keep a copy
+    return (tuple(len(state[key]) for key in _SYMBOLS), frozenset(state["headers"]),
+            state["main_written"])
+
+def _rollback(state: Dict, mark: Tuple) -> None:
+    """Undo the symbol-table and header effects of a snippet that was not kept."""
+    sizes, headers, main_written = mark
+    for key, n in zip(_SYMBOLS, sizes):
+        state[key].truncate(n)
+    if state["headers"] != headers:
+        state["headers"].clear()
+        state["headers"].update(headers)
+    state["main_written"] = main_written
+
+def min_budget(style: str = "auto") -> int:
+    """Smallest ``max_bytes`` a file can honour: the header plus a minimal ``main``
+    (for ``auto``, in the style that needs most)."""
+    styles = STYLE_TABLE.values() if style == "auto" else [STYLE_TABLE[style]]
+    return max(_byte_count(_HEADER + _MIN_MAIN, len(st["indent"]), st["brace_same"])
+               for st in styles)
+
+def _fill_bytes(nodes: List[Node], budget: int, registry: Dict, next_kind: Callable[[], str],
+                state: Dict) -> int:
+    """Append snippets while they fit in ``budget`` bytes; returns the size.
+
+    A snippet that would overflow is dropped (and its symbols rolled back) and
+    another is drawn, up to ``FILL_TRIES`` misses in a row, so the file ends
+    within one small snippet of the budget. Room for a minimal ``main`` is kept
+    until a real one has been placed.
+    """
+    style = STYLE_TABLE[state["style"]]
+    indent, same = len(style["indent"]), style["brace_same"]
+    reserve = _byte_count(_MIN_MAIN, indent, same)
+    size = _byte_count(nodes, indent, same)
+    misses = 0
+    while misses < FILL_TRIES:
+        mark = _mark(state)
+        snippet = registry[next_kind()](state)
+        if not snippet:
+            continue
+        n = _byte_count(snippet, indent, same)
+        if size + n > budget - (0 if state["main_written"] else reserve):
+            _rollback(state, mark)
+            misses += 1
+            continue
+        misses = 0
+        nodes += snippet
+        size += n
+    if not state["main_written"]:
+        state["main_written"] = True
+        nodes += _MIN_MAIN
+        size += reserve
+    return size
+
+@dataclass
+class Program:
+    """One generated file as IR: generate once, render to any style many times.
+
+    ``style`` is the style the ``loc`` (or ``max_bytes``) target was counted
+    in; rendering in it reproduces ``build_c`` byte for byte.
+    """
+    nodes: List[Node]
+    style: str
+    size: Optional[int] = None      # rendered bytes in ``style`` (byte-budget builds)
+
+    def render(self, style: Optional[str] = None, strip_comments: bool = False) -> str:
+        return render(self.nodes, style or self.style, strip_comments)
+
+    def idents(self) -> List[str]:
+        """Generated identifiers in order of first appearance."""
+        return list(dict.fromkeys(i for node in self.nodes for i in node.idents))
+
+def build_program(cfg: CConfig) -> Program:
+    """Same draws as :func:`iter_c`, kept as IR instead of text.
+
+    Raises ValueError for a ``max_bytes`` below :func:`min_budget`, which no
+    file could meet.
+    """
+    if cfg.max_bytes is not None and cfg.max_bytes < min_budget(cfg.style):
+        raise ValueError(f"max_bytes of {cfg.max_bytes:,} is below the {min_budget(cfg.style)}-byte "
+                         f"minimum (header and an empty main)")
+    rng = make_rng(cfg.rng, cfg.seed)
+    state = new_state(cfg, rng)
+    same = STYLE_TABLE[state["style"]]["brace_same"]
+
+    nodes: List[Node] = list(_HEADER)
+    lines = len(nodes)
+    next_kind = _kind_drawer(cfg, rng, state)
+    registry = (PROFILE.wrap(_IR_REGISTRY, lambda snippet: _line_count(snippet, same))
+                if PROFILE is not None else _IR_REGISTRY)
+    if cfg.max_bytes is not None:
+        size = _fill_bytes(nodes, cfg.max_bytes, registry, next_kind, state)
+        return Program(nodes, state["style"], size)
+
+    while lines < cfg.loc:
+        snippet = registry[next_kind()](state)
+        if snippet:
+            nodes += snippet
+            lines += _line_count(snippet, same)
+
+    if not state["main_written"]:
+        nodes += registry["main"](state)
+    return Program(nodes, state["style"])
+
+def render_styles(cfg: CConfig, styles: Sequence[str] = tuple(STYLE_TABLE)) -> Dict[str, str]:
+    """One generation pass, one cheap render per style."""
+    program = build_program(cfg)
+    return {style: program.render(style) for style in styles}
+
+# ──────────────────────────────────────────────────────────────
+# Variants (one generation, several renders)
+# ──────────────────────────────────────────────────────────────
+
+_WORD = re.compile(r"[A-Za-z_]\w*")
+_SUFFIXED = re.compile(r"(.+?)(_\d+)")       # enum items: NAME_0, NAME_1, ...
+# literals and include lines match without group 1 and are copied through
+_RENAME_TOKEN = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|^[ \t]*#[ \t]*include\b[^\n]*'
+                           r"|([A-Za-z_]\w*)", re.M)
+DEFAULT_VARIANTS = "kr,allman,gnu"
+
+@dataclass(frozen=True)
+class Variant:
+    """One augmented copy: ``style`` (None = the file's own), renamed, comment-free.
+
+    Spelled ``kr``, ``rename``, ``allman+strip``, ``gnu+rename+strip`` … on the CLI.
+    """
+    name: str
+    style: Optional[str] = None
+    rename: bool = False
+    strip: bool = False
+
+    def apply(self, program: Program, seed: int) -> str:
+        code = program.render(self.style, self.strip)
+        return rename_idents(code, program.idents(), seed) if self.rename else code
+
+def parse_variants(spec: str) -> List[Variant]:
+    out: List[Variant] = []
+    for name in spec.split(","):
+        name = name.strip()
+        style, rename, strip = None, False, False
+        for part in name.split("+"):
+            if part in STYLE_TABLE and style is None:
+                style = part
+            elif part == "rename" and not rename:
+                rename = True
+            elif part == "strip" and not strip:
+                strip = True
+            else:
+                raise ValueError(f"Bad variant {name!r} (use a style, rename, strip, joined by '+')")
+        out.append(Variant(name, style, rename, strip))
+    if len({v.name for v in out}) != len(out):
+        raise ValueError("Duplicate variant names")
+    return out
+
+def _recase(new: str, old: str) -> str:
+    if old.isupper():
+        return new.upper()
+    if old[0].isupper():
+        return new.capitalize()
+    return new
+
+def rename_idents(code: str, idents: Sequence[str], seed: int) -> str:
+    """Consistently replace the generated identifiers with fresh ones.
+
+    New names keep each old name's length and its case pattern (UPPER,
+    Capitalised, lower) and never collide with any word already in ``code``;
+    they are a pure function of ``seed``. A ``_<n>`` suffix is kept and the
+    stem renamed like the name it came from, so enum ``Foo`` with items
+    ``FOO_0, FOO_1`` becomes ``Bar`` with ``BAR_0, BAR_1``. String/char literals and
+    ``#include`` lines are left alone, as are one-letter names (macro
+    parameters), which are too likely to occur inside other tokens' text.
+    """
+    taken = set(_WORD.findall(code)) | C_KEYWORDS
+    names = NameGen(random.Random(seed ^ 0x5EED))
+    mapping: Dict[str, str] = {}
+    stems: Dict[str, str] = {}          # lower-cased old stem -> lower-cased new stem
+    for old in idents:
+        if len(old) < 2 or old in mapping:
+            continue
+        m = _SUFFIXED.fullmatch(old)
+        stem, suffix = m.groups() if m else (old, "")
+        key = stem.lower()
+        new = _recase(stems[key], stem) + suffix if key in stems else None
+        while new is None or new in taken:
+            stems[key] = names(len(stem))
+            new = _recase(stems[key], stem) + suffix
+        taken.add(new)
+        mapping[old] = new
+    get = mapping.get
+
+    def sub(m: "re.Match") -> str:
+        word = m.group(1)
+        return m.group(0) if word is None else get(word, word)
+
+    return _RENAME_TOKEN.sub(sub, code)
 
-    return "".join(parts)
+def write_c(cfg: CConfig, path: Path, buffering: int = 1 << 20) -> None:
+    """Stream ``iter_c`` straight to ``path`` through a large write buffer."""
+    with path.open("w", encoding="utf-8", buffering=buffering) as fh:
+        for chunk in iter_c(cfg):
+            fh.write(chunk)
+
+# ──────────────────────────────────────────────────────────────
+# Corpus mode (many files, sharded, multi-process)
+# ──────────────────────────────────────────────────────────────
+
+MANIFEST_NAME = "manifest.json"
+
+def file_seed(master_seed: int, index: int) -> int:
+    """Per-file seed: a pure function of the master seed and file index."""
+    digest = hashlib.blake2b(f"{master_seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+def shard_name(shard: int) -> str:
+    return f"shard-{shard:05d}.jsonl"
+
+def _write_shard(cfg: CConfig, out_dir: Path, shard: int, start: int, stop: int,
+                 master_seed: int, profile: bool = False,
+                 variants: Sequence[Variant] = ()) -> Dict:
+    """Generate files ``start..stop-1`` into one JSONL shard (worker entry point).
+
+    With ``variants`` each file is generated once as IR and every variant is a
+    row of its own (same ``id``/``seed``, plus ``variant``), adjacent in the shard.
+    """
+    global PROFILE
+    PROFILE = GenProfile() if profile else None
+    path = out_dir / shard_name(shard)
+    sha = hashlib.sha256()
+    size = lines = 0
+    clock = time.perf_counter
+    gen_secs = 0.0
+    per_variant = {v.name: {"rows": 0, "lines": 0, "bytes": 0, "seconds": 0.0} for v in variants}
+    with path.open("wb") as fh:
+        for i in range(start, stop):
+            seed = file_seed(master_seed, i)
+            if not variants:
+                code = build_c(replace(cfg, seed=seed))
+                row = (json.dumps({"id": i, "seed": seed, "code": code}, ensure_ascii=False) + "\n").encode()
+                fh.write(row)
+                sha.update(row)
+                size += len(row)
+                lines += code.count("\n")
+                continue
+            t0 = clock()
+            program = build_program(replace(cfg, seed=seed))
+            gen_secs += clock() - t0
+            for v in variants:
+                t0 = clock()
+                code = v.apply(program, seed)
+                row = (json.dumps({"id": i, "seed": seed, "variant": v.name, "code": code},
+                                  ensure_ascii=False) + "\n").encode()
+                st = per_variant[v.name]
+                st["seconds"] += clock() - t0
+                fh.write(row)
+                sha.update(row)
+                n = code.count("\n")
+                st["rows"] += 1
+                st["lines"] += n
+                st["bytes"] += len(row)
+                size += len(row)
+                lines += n
+    meta = {"name": path.name, "first_id": start, "files": stop - start,
+            "lines": lines, "bytes": size, "sha256": sha.hexdigest()}
+    if variants:
+        meta["rows"] = (stop - start) * len(variants)
+        meta["generate_seconds"] = gen_secs
+        meta["variants"] = per_variant
+    if PROFILE is not None:
+        meta["profile"] = PROFILE.as_dict()
+        PROFILE = None
+    return meta
+
+def _manifest(cfg: CConfig, master_seed: int, files: int) -> Dict:
+    return {
+        "generator": f"c_gen_adv {__version__}",
+        "seed": master_seed,
+        "files": files,
+        "loc": cfg.loc,
+        "style": cfg.style,
+        "sampler": cfg.sampler,
+        "names": cfg.names,
+        "unique_names": cfg.unique_names,
+        "rng": cfg.rng,
+        "rng_version": rng_version(cfg.rng),
+        "weights": cfg.weights,
+    }
+
+def build_corpus(cfg: CConfig, files: int, out_dir: Path, jobs: int = 1,
+                 shard_size: int = 1000, profile: Optional[GenProfile] = None,
+                 variants: Sequence[Variant] = ()) -> Dict:
+    """Write ``files`` generated sources as JSONL shards plus a manifest.
+
+    Each file's seed is derived from ``cfg.seed`` and its index, and shards are
+    fixed ranges of indices, so the output does not depend on ``jobs``.
+    ``variants`` fans every file out into one row per variant; the manifest
+    then also carries per-variant totals and worker seconds.
+    """
+    master_seed = cfg.seed if cfg.seed is not None else random.SystemRandom().getrandbits(63)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    ranges = [(k, lo, min(lo + shard_size, files))
+              for k, lo in enumerate(range(0, files, shard_size))]
+
+    if jobs <= 1:
+        shards = [_write_shard(cfg, out_dir, k, lo, hi, master_seed, profile is not None, variants)
+                  for k, lo, hi in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_write_shard, cfg, out_dir, k, lo, hi, master_seed,
+                                   profile is not None, variants)
+                       for k, lo, hi in ranges]
+            shards = [f.result() for f in futures]
+    if profile is not None:             # worker counters, kept out of the manifest
+        for shard in shards:
+            profile.merge(shard.pop("profile"))
+
+    manifest = _manifest(cfg, master_seed, files)
+    manifest["shard_size"] = shard_size
+    manifest["shards"] = shards
+    if variants:
+        totals = {v.name: {"rows": 0, "lines": 0, "bytes": 0, "seconds": 0.0} for v in variants}
+        for shard in shards:
+            for name, st in shard.pop("variants").items():
+                for key, val in st.items():
+                    totals[name][key] += val
+        manifest["variants"] = totals
+        manifest["generate_seconds"] = sum(s.pop("generate_seconds") for s in shards)
+        manifest["rows"] = files * len(variants)
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    return manifest
+
+# ──────────────────────────────────────────────────────────────
+# Budget mode (total bytes / approximate tokens)
+# ──────────────────────────────────────────────────────────────
+
+BYTES_PER_TOKEN = 3.5           # rough code-tokenizer ratio for --budget-tokens
+
+def bytes_per_line(cfg: CConfig, seed: int) -> float:
+    """Average rendered line length, from one probe file at ``cfg.loc``."""
+    code = build_c(replace(cfg, seed=seed, max_bytes=None))
+    return len(code) / max(1, code.count("\n"))
+
+def plan_budget(budget: int, shard_bytes: int, file_bytes: int) -> List[Tuple[int, int, int]]:
+    """Split ``budget`` code bytes into shards of ``shard_bytes`` (``first_id, files, bytes``).
+
+    Each shard holds ``shard_bytes // file_bytes`` files (at least one); a tail
+    shorter than half a file is folded into the previous shard, so no file is
+    planned below ``file_bytes / 2``. Shard budgets sum to ``budget`` exactly.
+    """
+    if budget < file_bytes // 2:
+        raise ValueError(f"Budget of {budget:,} bytes is below half a file ({file_bytes:,} bytes)")
+    sizes = [shard_bytes] * (budget // shard_bytes)
+    tail = budget - sum(sizes)
+    if tail >= file_bytes // 2 or not sizes:
+        sizes.append(tail)
+    elif tail:
+        sizes[-1] += tail
+    plan, first = [], 0
+    for size in sizes:
+        files = max(1, round(size / file_bytes))
+        plan.append((first, files, size))
+        first += files
+    return plan
+
+def _write_budget_shard(cfg: CConfig, out_dir: Path, shard: int, first_id: int, files: int,
+                        budget: int, master_seed: int, profile: bool = False) -> Dict:
+    """Fill one shard with ``files`` files totalling at most ``budget`` code bytes.
+
+    Each file targets an equal share of what is left, so a file that ends a
+    few bytes short hands them on to the next one.
+    """
+    global PROFILE
+    PROFILE = GenProfile() if profile else None
+    path = out_dir / shard_name(shard)
+    sha = hashlib.sha256()
+    size = lines = code_bytes = 0
+    with path.open("wb") as fh:
+        for j in range(files):
+            i = first_id + j
+            seed = file_seed(master_seed, i)
+            target = (budget - code_bytes) // (files - j)
+            program = build_program(replace(cfg, seed=seed, max_bytes=target))
+            code = program.render()
+            row = (json.dumps({"id": i, "seed": seed, "code": code}, ensure_ascii=False) + "\n").encode()
+            fh.write(row)
+            sha.update(row)
+            size += len(row)
+            lines += code.count("\n")
+            code_bytes += program.size
+    meta = {"name": path.name, "first_id": first_id, "files": files, "lines": lines,
+            "bytes": size, "budget": budget, "code_bytes": code_bytes, "sha256": sha.hexdigest()}
+    if PROFILE is not None:
+        meta["profile"] = PROFILE.as_dict()
+        PROFILE = None
+    return meta
+
+def build_budget_corpus(cfg: CConfig, budget: int, out_dir: Path, jobs: int = 1,
+                        shard_bytes: int = 64 << 20, file_bytes: Optional[int] = None,
+                        profile: Optional[GenProfile] = None) -> Dict:
+    """Write a corpus of at most ``budget`` code bytes, in shards of ``shard_bytes``.
+
+    ``file_bytes`` (default: ``cfg.loc`` lines at the probed average line
+    length) sizes the files; the plan depends only on the arguments and the
+    seed, so the output does not depend on ``jobs``.
+    """
+    master_seed = cfg.seed if cfg.seed is not None else random.SystemRandom().getrandbits(63)
+    if file_bytes is None:
+        file_bytes = round(cfg.loc * bytes_per_line(cfg, master_seed))
+    plan = plan_budget(budget, shard_bytes, file_bytes)
+    floor = min_budget(cfg.style)
+    if any(size // files < floor for _, files, size in plan):
+        raise ValueError(f"Files of about {file_bytes:,} bytes leave some below the {floor}-byte "
+                         f"minimum per file; raise loc")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    if jobs <= 1:
+        shards = [_write_budget_shard(cfg, out_dir, k, first, n, size, master_seed, profile is not None)
+                  for k, (first, n, size) in enumerate(plan)]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_write_budget_shard, cfg, out_dir, k, first, n, size, master_seed,
+                                   profile is not None)
+                       for k, (first, n, size) in enumerate(plan)]
+            shards = [f.result() for f in futures]
+    if profile is not None:             # worker counters, kept out of the manifest
+        for shard in shards:
+            profile.merge(shard.pop("profile"))
+
+    manifest = _manifest(cfg, master_seed, sum(n for _, n, _ in plan))
+    manifest.update({
+        "budget_bytes": budget,
+        "code_bytes": sum(s["code_bytes"] for s in shards),
+        "shard_bytes": shard_bytes,
+        "file_bytes": file_bytes,
+        "shards": shards,
+    })
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    return manifest
 
 # ──────────────────────────────────────────────────────────────
 # CLI helpers
 # ──────────────────────────────────────────────────────────────
 
-def _compile_check(code: str) -> None:
-    for compiler in ("clang", "gcc"):
-        if subprocess.run(["which", compiler], capture_output=True).returncode == 0:
-            cmd = [compiler, "-x", "c", "-", "-std=c17", "-Werror", "-o", "/dev/null"]
-            proc = subprocess.run(cmd, input=code, text=True, capture_output=True)
-            msg = "passed" if proc.returncode == 0 else f"failed:\n{proc.stderr}"
-            print(f"[*] {compiler} smoke-test {msg}", file=sys.stderr)
-            return
-    print("[*] No C compiler found for --check", file=sys.stderr)
+def _compile_check(code: str, cache: Optional[CompileCache]) -> None:
+    checker = CompileChecker(cache=cache)
+    if checker.compiler is None:
+        print("[*] No C compiler found for --check", file=sys.stderr)
+        return
+    res = checker.check(code)
+    msg = "passed" if res.ok else f"failed:\n{res.stderr}"
+    print(f"[*] {checker.compiler} smoke-test {msg}", file=sys.stderr)
+
+def _compile_check_corpus(out_dir: Path, jobs: int, cache: Optional[CompileCache],
+                          engine: str = "threads") -> None:
+    checker = CompileChecker(jobs=jobs, syntax_only=True, cache=cache, engine=engine)
+    if checker.compiler is None:
+        print("[*] No C compiler found for --check", file=sys.stderr)
+        return
+    failed = [r.name for r in checker.check_many(iter_units([out_dir]), batch=64) if not r.ok]
+    for name in failed[:10]:
+        print(f"[*] failed: {name}", file=sys.stderr)
+    print(f"[*] {checker.compiler} smoke-test: {checker.stats.summary()}", file=sys.stderr)
+
+def _variant_report(manifest: Dict) -> str:
+    """Per-variant throughput, in worker-seconds (generation is shared by all)."""
+    gen = manifest["generate_seconds"] or 1e-9
+    rows = [f"{'variant':<22} {'rows':>9} {'MB':>8} {'rows/s':>10} {'MB/s':>8}",
+            f"{'(generate, shared)':<22} {manifest['files']:>9,} {'':>8} {manifest['files'] / gen:>10,.0f} {'':>8}"]
+    for name, st in manifest["variants"].items():
+        secs = st["seconds"] or 1e-9
+        rows.append(f"{name:<22} {st['rows']:>9,} {st['bytes'] / 1e6:>8.1f} "
+                    f"{st['rows'] / secs:>10,.0f} {st['bytes'] / 1e6 / secs:>8.1f}")
+    return "\n".join(rows)
 
 def _parse_weights(arg: Optional[str]) -> Dict[str, float]:
     base = CConfig().weights.copy()
@@ -327,27 +937,133 @@ def _cli() -> None:
                    help="Brace/indent style")
     p.add_argument("--weights", type=str, help="Override weights: key=val[,key=val...]")
     p.add_argument("--check", action="store_true", help="Compile smoke-test via gcc/clang")
+    p.add_argument("--no-cache", action="store_true",
+                   help="Bypass the compile-result cache used by --check")
+    p.add_argument("--check-engine", choices=ENGINES, default="threads",
+                   help="Corpus --check: thread pool, or one asyncio loop driving --jobs compilers")
+    p.add_argument("--sampler", choices=["choices", "table", "adaptive"], default="choices",
+                   help="Construct sampler: per-draw rng.choices, batched cumulative table, "
+                        "or table that masks generators whose precondition fails")
+    p.add_argument("--names", choices=["fast", "legacy"], default="fast",
+                   help="Identifier draws: bulk base-26 (fast) or per-letter (legacy; the draws "
+                        "before the fast path, not a past release's output)")
+    p.add_argument("--unique-names", action="store_true",
+                   help="Never emit the same identifier twice in a file")
+    p.add_argument("--rng", choices=RNG_KINDS, default="python",
+                   help="state['rng'] provider: random.Random, or block pre-draws via NumPy "
+                        "(own stream: different files for the same seed)")
+    p.add_argument("--profile", action="store_true",
+                   help="Print per-generator calls/time/lines/empty returns to stderr")
+    p.add_argument("--files", type=int, help="Corpus mode: number of files to generate")
+    p.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                   help="Corpus mode: worker processes")
+    p.add_argument("--out-dir", type=Path, help="Corpus mode: directory for shards + manifest")
+    p.add_argument("--shard-size", type=int, default=1000, help="Corpus mode: files per shard")
+    p.add_argument("--budget-bytes", type=int,
+                   help="Stop at this many bytes of C (one file, or the whole corpus with --out-dir)")
+    p.add_argument("--budget-tokens", type=int,
+                   help="Like --budget-bytes, converted with --bytes-per-token")
+    p.add_argument("--bytes-per-token", type=float, default=BYTES_PER_TOKEN,
+                   help="Approximate bytes per token for --budget-tokens")
+    p.add_argument("--shard-bytes", type=int, default=64 << 20,
+                   help="Budget corpus mode: code bytes per shard (files per shard follow from --loc)")
+    p.add_argument("--variants", nargs="?", const=DEFAULT_VARIANTS,
+                   help="Corpus mode: generate each file once and write one row per variant, "
+                        f"e.g. kr,allman,gnu,rename,gnu+strip (default: {DEFAULT_VARIANTS})")
     args = p.parse_args()
+    if args.budget_bytes is not None and args.budget_tokens is not None:
+        p.error("give --budget-bytes or --budget-tokens, not both")
+    budget = args.budget_bytes
+    if args.budget_tokens is not None:
+        budget = round(args.budget_tokens * args.bytes_per_token)
+    if budget is not None and args.files is not None:
+        p.error("--files is decided by the budget; use --out-dir alone")
+    if (args.files is None) != (args.out_dir is None) and budget is None:
+        p.error("--files and --out-dir must be given together")
+    if budget is not None and args.variants:
+        p.error("--variants is not supported with a byte/token budget")
+    try:
+        variants = parse_variants(args.variants) if args.variants else []
+    except ValueError as e:
+        p.error(str(e))
+    if variants and args.files is None:
+        p.error("--variants needs corpus mode (--files/--out-dir)")
+    if args.rng == "numpy" and not HAVE_NUMPY:
+        p.error("--rng numpy needs the 'numpy' package")
 
     cfg = CConfig(
         loc=args.loc,
         seed=args.seed,
         style=args.style,
         check=args.check,
+        sampler=args.sampler,
+        names=args.names,
+        unique_names=args.unique_names,
+        rng=args.rng,
         weights=_parse_weights(args.weights),
     )
 
-    code = build_c(cfg)
+    cache = CompileCache() if args.check and not args.no_cache else None
+    global PROFILE
+    profile = GenProfile() if args.profile else None
+
+    if budget is not None and args.out_dir is not None:
+        t0 = time.perf_counter()
+        try:
+            manifest = build_budget_corpus(cfg, budget, args.out_dir, args.jobs, args.shard_bytes,
+                                           profile=profile)
+        except ValueError as e:
+            p.error(str(e))
+        secs = time.perf_counter() - t0
+        print(f"✔ wrote {manifest['code_bytes']:,}/{budget:,} bytes of C in {manifest['files']:,} files, "
+              f"{len(manifest['shards'])} shards → {args.out_dir} "
+              f"({manifest['code_bytes'] / 1e6 / secs:,.1f} MB/s, {args.jobs} jobs)")
+        if args.check:
+            _compile_check_corpus(args.out_dir, args.jobs, cache, args.check_engine)
+        if profile is not None:
+            print(profile.table(), file=sys.stderr)
+        return
+    if budget is not None:
+        if budget < min_budget(cfg.style):
+            p.error(f"a budget of {budget:,} bytes is below the {min_budget(cfg.style)}-byte minimum "
+                    f"for one file (header and an empty main)")
+        cfg = replace(cfg, max_bytes=budget)
+
+    if args.files is not None:
+        t0 = time.perf_counter()
+        manifest = build_corpus(cfg, args.files, args.out_dir, args.jobs, args.shard_size, profile,
+                                variants)
+        secs = time.perf_counter() - t0
+        print(f"✔ wrote {args.files:,} files in {len(manifest['shards'])} shards → "
+              f"{args.out_dir} ({args.files / secs:,.0f} files/s, {args.jobs} jobs)")
+        if variants:
+            print(_variant_report(manifest), file=sys.stderr)
+        if args.check:
+            _compile_check_corpus(args.out_dir, args.jobs, cache, args.check_engine)
+        if profile is not None:
+            print(profile.table(), file=sys.stderr)
+        return
+
+    PROFILE = profile
 
     if args.check:
-        _compile_check(code)
+        # the compiler needs the whole unit, so only --check materialises it
+        code = build_c(cfg)
+        _compile_check(code, cache)
+        chunks: Iterable[str] = (code,)
+    else:
+        chunks = iter_c(cfg)
 
     if args.out:
         args.out.parent.mkdir(parents=True, exist_ok=True)
-        args.out.write_text(code, encoding="utf-8")
+        with args.out.open("w", encoding="utf-8", buffering=1 << 20) as fh:
+            fh.writelines(chunks)
         print(f"✔ Saved generated C code to {args.out}")
     else:
-        sys.stdout.write(code)
+        sys.stdout.writelines(chunks)
+
+    if PROFILE is not None:
+        print(PROFILE.table(), file=sys.stderr)
 
 if __name__ == "__main__":
     _cli()
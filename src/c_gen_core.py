@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# c_gen_core.py · v0.1.0
+"""
+Building blocks shared by the C generators (``c_gen`` and ``c_gen_adv``).
+
+Highlights
+----------
+* ``WeightedSampler`` / ``AdaptiveSampler``: batched and gate-aware kind draws
+  behind ``--sampler table`` / ``--sampler adaptive``
+* ``GenProfile``: per-kind call/time/line/empty counters behind ``--profile``
+* ``SymbolTable``: insertion-ordered set with O(1) pick and rollback
+* ``NameGen``: bulk identifier draws, optionally unique per file
+
+Each generator keeps its own registry, ``_READY`` gates and ``PROFILE``; only
+the machinery lives here.
+
+Usage
+-----
+from c_gen_core import NameGen, SymbolTable, weighted_sampler
+"""
+from __future__ import annotations
+
+import bisect
+import random
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import accumulate
+from operator import methodcaller
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+__version__ = "0.1.0"
+
+ReadyFn = Callable[[Dict], bool]
+
+# ──────────────────────────────────────────────────────────────
+# Kind samplers
+# ──────────────────────────────────────────────────────────────
+
+class WeightedSampler:
+    """Draw generator kinds from a fixed weight table.
+
+    The cumulative table is built once (``rng.choices`` rebuilds it on every
+    call); each draw is then a single ``bisect``. Uniforms are pulled from the
+    RNG ``batch`` at a time.
+    """
+    __slots__ = ("kinds", "_cum", "_total")
+
+    def __init__(self, weights: Dict[str, float]) -> None:
+        self.kinds: Tuple[str, ...] = tuple(weights)
+        self._cum: List[float] = list(accumulate(weights.values()))
+        self._total = self._cum[-1] if self._cum else 0.0
+        if self._total <= 0.0:
+            raise ValueError("Total of weights must be greater than zero")
+
+    def stream(self, rng: random.Random, batch: int = 4096) -> Iterator[str]:
+        kinds, cum, total = self.kinds, self._cum, self._total
+        hi = len(cum) - 1
+        rand, find = rng.random, bisect.bisect
+        while True:
+            for u in [rand() for _ in range(batch)]:
+                yield kinds[find(cum, u * total, 0, hi)]
+
+class AdaptiveSampler:
+    """Batched cumulative-table sampler that never draws a kind it would waste.
+
+    Kinds registered with a ``ready`` precondition are masked (weight 0) while
+    it is false and the remaining weights renormalised. That is exactly the
+    distribution the plain samplers produce by drawing the kind anyway and
+    retrying on "" (rejection sampling), minus the wasted calls. Gates are
+    checked before each draw, but the table is only rebuilt when one flips
+    (main written, first func_decl), i.e. a handful of times per file.
+    """
+    __slots__ = ("kinds", "_weights", "_gates", "_open", "_state", "_rand",
+                 "_batch", "_buf", "_cum", "_total", "_hi")
+
+    def __init__(self, weights: Dict[str, float], ready: Dict[str, ReadyFn], state: Dict,
+                 rng: random.Random, batch: int = 4096) -> None:
+        self.kinds: Tuple[str, ...] = tuple(weights)
+        self._weights = list(weights.values())
+        self._gates = [(i, ready[k]) for i, k in enumerate(self.kinds) if k in ready]
+        self._open = [True] * len(self.kinds)
+        self._state = state
+        self._rand = rng.random
+        self._batch = batch
+        self._buf: List[float] = []
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        for i, pred in self._gates:
+            self._open[i] = pred(self._state)
+        self._cum = list(accumulate(w if ok else 0.0 for w, ok in zip(self._weights, self._open)))
+        self._total = self._cum[-1] if self._cum else 0.0
+        self._hi = len(self._cum) - 1
+        if self._total <= 0.0:
+            raise ValueError("No generator is ready to draw")
+
+    def __call__(self) -> str:
+        state, is_open = self._state, self._open
+        for i, pred in self._gates:
+            if pred(state) != is_open[i]:
+                self._rebuild()
+                break
+        if not self._buf:
+            rand = self._rand
+            self._buf = [rand() for _ in range(self._batch)]
+        return self.kinds[bisect.bisect(self._cum, self._buf.pop() * self._total, 0, self._hi)]
+
+@lru_cache(maxsize=64)              # bounded: weight tables can come from clients
+def _sampler_for(items: Tuple[Tuple[str, float], ...]) -> WeightedSampler:
+    return WeightedSampler(dict(items))
+
+def weighted_sampler(weights: Dict[str, float]) -> WeightedSampler:
+    """Shared sampler per distinct weight table (i.e. once per ``CConfig``)."""
+    return _sampler_for(tuple(weights.items()))
+
+# ──────────────────────────────────────────────────────────────
+# Profiling
+# ──────────────────────────────────────────────────────────────
+
+@dataclass
+class KindStats:
+    calls: int = 0
+    seconds: float = 0.0
+    lines: int = 0
+    empty: int = 0                 # calls that returned "" (wasted draws)
+
+class GenProfile:
+    """Per-kind call/time/line/empty counters for the registered generators.
+
+    Only consulted when a generator's ``PROFILE`` is set; its ``iter_c`` (and
+    ``build_program``) then swap in timed wrappers once per file, so the
+    unprofiled path is untouched. IR snippets are counted in rendered lines
+    via ``lines``.
+    """
+
+    def __init__(self) -> None:
+        self.kinds: Dict[str, KindStats] = {}
+
+    def wrap(self, registry: Dict[str, Callable], lines: Optional[Callable] = None) -> Dict[str, Callable]:
+        count = lines if lines is not None else methodcaller("count", "\n")
+        return {kind: self._timed(fn, self.kinds.setdefault(kind, KindStats()), count)
+                for kind, fn in registry.items()}
+
+    @staticmethod
+    def _timed(fn: Callable, st: KindStats, count: Callable) -> Callable:
+        clock = time.perf_counter
+        def timed(state: Dict):
+            t0 = clock()
+            out = fn(state)
+            st.seconds += clock() - t0
+            st.calls += 1
+            if out:
+                st.lines += count(out)
+            else:
+                st.empty += 1
+            return out
+        return timed
+
+    def merge(self, kinds: Dict[str, Dict]) -> None:
+        for kind, d in kinds.items():
+            st = self.kinds.setdefault(kind, KindStats())
+            st.calls += d["calls"]
+            st.seconds += d["seconds"]
+            st.lines += d["lines"]
+            st.empty += d["empty"]
+
+    def as_dict(self) -> Dict[str, Dict]:
+        return {kind: vars(st).copy() for kind, st in self.kinds.items()}
+
+    def table(self) -> str:
+        total = sum(st.seconds for st in self.kinds.values()) or 1.0
+        rows = [f"{'kind':<15} {'calls':>9} {'empty':>9} {'lines':>9} {'ms':>9} {'µs/call':>8} {'time%':>6}"]
+        for kind, st in sorted(self.kinds.items(), key=lambda kv: -kv[1].seconds):
+            per = st.seconds / st.calls * 1e6 if st.calls else 0.0
+            rows.append(f"{kind:<15} {st.calls:>9,} {st.empty:>9,} {st.lines:>9,} "
+                        f"{st.seconds * 1e3:>9.1f} {per:>8.2f} {st.seconds / total:>6.1%}")
+        return "\n".join(rows)
+
+# ──────────────────────────────────────────────────────────────
+# Symbols and names
+# ──────────────────────────────────────────────────────────────
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+class SymbolTable:
+    """Insertion-ordered set with O(1) ``add`` and O(1) uniform ``pick``.
+
+    Replaces the plain ``set`` + ``list(...)`` rebuild the generators used to do
+    on every call, which made ``build_c`` quadratic in ``loc`` and made seeded
+    output depend on string hashing (PYTHONHASHSEED).
+    """
+    __slots__ = ("_items", "_seen")
+
+    def __init__(self) -> None:
+        self._items: List = []
+        self._seen: Set = set()
+
+    def add(self, item) -> None:
+        if item not in self._seen:
+            self._seen.add(item)
+            self._items.append(item)
+
+    def pick(self, rng: random.Random):
+        return self._items[rng.randrange(len(self._items))]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, i: int):
+        return self._items[i]
+
+    def __contains__(self, item) -> bool:
+        return item in self._seen
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def truncate(self, n: int) -> None:
+        """Forget everything added after the first ``n`` items."""
+        for item in self._items[n:]:
+            self._seen.discard(item)
+        del self._items[n:]
+
+def pick_from(rng: random.Random, *pools: Sequence) -> str:
+    """Uniform pick over the concatenation of ``pools`` without building it."""
+    i = rng.randrange(sum(len(p) for p in pools))
+    for pool in pools:
+        if i < len(pool):
+            return pool[i]
+        i -= len(pool)
+    raise IndexError("pick_from() on empty pools")
+
+C_KEYWORDS = frozenset("""
+auto break case char const continue default do double else enum extern float for
+goto if inline int long register restrict return short signed sizeof static struct
+switch typedef union unsigned void volatile while
+""".split())
+
+_PAIRS = [a + b for a in LETTERS for b in LETTERS]
+
+def fresh_name(rng: random.Random, length: int = 6) -> str:
+    return "".join(rng.choice(LETTERS) for _ in range(length))
+
+class NameGen:
+    """Identifier source for one generated file.
+
+    ``mode="fast"`` decodes one ``randrange(26**length)`` draw two letters at a
+    time instead of calling ``rng.choice`` per letter; ``mode="legacy"`` is
+    :func:`fresh_name`, the per-letter draws of the commit just before the fast
+    path. It reproduces that commit's names only: earlier changes to the seeded
+    draws mean it does not recreate files from the released versions. Both are
+    deterministic per seed. With ``unique=True`` no identifier is handed
+    out twice per file and C keywords are skipped; after repeated collisions
+    the length grows by one so small lengths cannot exhaust.
+    """
+    __slots__ = ("_rng", "_draw", "unique", "_issued")
+
+    def __init__(self, rng: random.Random, mode: str = "fast", unique: bool = False) -> None:
+        if mode not in ("fast", "legacy"):
+            raise ValueError(f"Unknown name mode: {mode}")
+        self._rng = rng
+        self._draw = self._fast if mode == "fast" else self._legacy
+        self.unique = unique
+        self._issued: Set[str] = set()
+
+    def _legacy(self, length: int) -> str:
+        return fresh_name(self._rng, length)
+
+    def _fast(self, length: int) -> str:
+        n = self._rng.randrange(26 ** length)
+        out = []
+        for _ in range(length >> 1):
+            n, r = divmod(n, 676)
+            out.append(_PAIRS[r])
+        if length & 1:
+            out.append(LETTERS[n])
+        return "".join(out)
+
+    def __call__(self, length: int = 6, unique: Optional[bool] = None) -> str:
+        if not (self.unique if unique is None else unique):
+            return self._draw(length)
+        tries = 0
+        while True:
+            name = self._draw(length)
+            if name not in self._issued and name not in C_KEYWORDS:
+                self._issued.add(name)
+                return name
+            tries += 1
+            if tries % 8 == 0:
+                length += 1
+
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# c_oracles.py · v0.1.0
+"""
+Precomputed ground truth for the task factories' asserts.
+
+Highlights
+----------
+* Primality from a bytearray sieve over the configured range (one pass at
+  start-up, O(1) per query); queries past the limit fall back to trial
+  division, so the sieve never grows past ``prime_limit`` bytes
+* Factorials from a table built once up to the configured ``n``
+* gcd is the builtin ``math.gcd`` (already faster than any cache lookup)
+* Index of a key in a sorted array by bisection instead of ``list.index``
+
+A task draws values, then asks the oracle; widening a task's value range only
+changes the one-off table size, not the cost per record.
+
+Usage
+-----
+from c_oracles import Oracles
+ORACLE = Oracles(prime_limit=10_000_000, factorial_limit=20)
+ORACLE.is_prime(9_999_991)   # -> True
+python c_oracles.py --prime-limit 10000000 97 100 9999991
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import math
+from typing import List, Sequence
+
+__version__ = "0.1.0"
+
+# ──────────────────────────────────────────────────────────────
+# Tables
+# ──────────────────────────────────────────────────────────────
+
+class PrimeSieve:
+    """Sieve of Eratosthenes over ``[0, limit]``; one byte per number.
+
+    Numbers past ``limit`` are answered by trial division instead of growing
+    the table, so memory stays at ``limit`` bytes whatever is queried.
+    """
+    __slots__ = ("limit", "flags")
+
+    def __init__(self, limit: int) -> None:
+        limit = max(limit, 2)
+        flags = bytearray([1]) * (limit + 1)
+        flags[0:2] = b"\x00\x00"
+        for p in range(2, math.isqrt(limit) + 1):
+            if flags[p]:
+                flags[p * p::p] = bytes(len(range(p * p, limit + 1, p)))
+        self.limit, self.flags = limit, flags
+
+    def __contains__(self, n: int) -> bool:
+        if n <= self.limit:
+            return n >= 0 and bool(self.flags[n])
+        return _trial_division(n)
+
+def _trial_division(n: int) -> bool:
+    if n < 4:
+        return n > 1
+    if n % 2 == 0 or n % 3 == 0:
+        return False
+    for d in range(5, math.isqrt(n) + 1, 6):
+        if n % d == 0 or n % (d + 2) == 0:
+            return False
+    return True
+
+class FactorialTable:
+    """``n!`` for ``0 <= n <= limit``, extended on demand."""
+    __slots__ = ("values",)
+
+    def __init__(self, limit: int) -> None:
+        self.values: List[int] = [1]
+        self._extend(limit)
+
+    def _extend(self, limit: int) -> None:
+        values = self.values
+        for n in range(len(values), limit + 1):
+            values.append(values[-1] * n)
+
+    def __getitem__(self, n: int) -> int:
+        if n >= len(self.values):
+            self._extend(n)
+        return self.values[n]
+
+# ──────────────────────────────────────────────────────────────
+# Oracle facade
+# ──────────────────────────────────────────────────────────────
+
+class Oracles:
+    """Ground-truth answers for one factory's value ranges."""
+
+    gcd = staticmethod(math.gcd)
+
+    def __init__(self, prime_limit: int = 1 << 16, factorial_limit: int = 20) -> None:
+        self.primes = PrimeSieve(prime_limit)
+        self.factorials = FactorialTable(factorial_limit)
+
+    def is_prime(self, n: int) -> bool:
+        return n in self.primes
+
+    def factorial(self, n: int) -> int:
+        return self.factorials[n]
+
+    @staticmethod
+    def sorted_index(arr: Sequence[int], key: int) -> int:
+        """Index of ``key`` in ascending ``arr`` (first match, like ``list.index``)."""
+        i = bisect.bisect_left(arr, key)
+        if i == len(arr) or arr[i] != key:
+            raise ValueError(f"{key} is not in the array")
+        return i
+
+# ──────────────────────────────────────────────────────────────
+# CLI
+# ──────────────────────────────────────────────────────────────
+
+def _cli() -> None:
+    ap = argparse.ArgumentParser(description="Query the task-factory ground-truth oracles.")
+    ap.add_argument("numbers", nargs="*", type=int, help="Print primality and (for n <= 20) n!")
+    ap.add_argument("--prime-limit", type=int, default=1 << 16, help="Sieve upper bound")
+    args = ap.parse_args()
+
+    oracle = Oracles(prime_limit=args.prime_limit)
+    print(f"✔ sieve over [0, {oracle.primes.limit:,}] · {len(oracle.primes.flags):,} bytes")
+    for n in args.numbers:
+        extra = f"  {n}! = {oracle.factorial(n)}" if 0 <= n <= 20 else ""
+        print(f"{n}: {'prime' if oracle.is_prime(n) else 'composite'}{extra}")
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# c_records.py · v0.1.0
+"""
+Length-prefixed binary record files for task datasets (``.crec``), a
+zero-copy reader, and a JSONL ↔ binary converter.
+
+File layout (little-endian)
+---------------------------
+header   b"CREC" · u16 version · u16 n_fields · n_fields × (u16 len · UTF-8 name)
+record   n_fields × u32 length · field bytes back to back
+footer   n_records × u64 record offset · u64 n_records · b"CIDX"
+
+A length of 0xFFFFFFFF means the field is absent from that record; the top
+bit (0x80000000) marks a non-string value stored as JSON text. Everything else
+is the raw UTF-8 of a string field, so writing is an ``encode`` and a
+``struct.pack`` — no JSON escaping — and reading a field is slicing a
+``memoryview`` over the mmapped file. Files without a footer (an interrupted
+write) are still readable; the reader then walks the length headers once.
+
+Usage
+-----
+python c_task_factory_advanced.py 1000000 --seed 1 --out c_train.crec --format bin
+python c_records.py to-bin c_train.jsonl c_train.crec
+python c_records.py to-jsonl c_train.crec c_train.jsonl
+python c_records.py show c_train.crec 0 42
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional, Sequence, Tuple
+
+__version__ = "0.1.0"
+
+MAGIC = b"CREC"
+FOOTER_MAGIC = b"CIDX"
+VERSION = 1
+DEFAULT_FIELDS: Tuple[str, ...] = ("instruction", "question", "answer", "explanation", "verified")
+
+ABSENT = 0xFFFFFFFF
+JSON_BIT = 0x80000000
+
+_HEAD = struct.Struct("<4sHH")
+_NAME = struct.Struct("<H")
+_TAIL = struct.Struct("<Q4s")
+
+def _le(words: array) -> array:
+    """``words`` in little-endian order (a swapped copy on big-endian hosts)."""
+    if sys.byteorder == "little":
+        return words
+    swapped = array(words.typecode, words)
+    swapped.byteswap()
+    return swapped
+
+# ──────────────────────────────────────────────────────────────
+# Writer
+# ──────────────────────────────────────────────────────────────
+
+class RecordWriter:
+    """Append records (dicts over a fixed field list) to a ``.crec`` file."""
+
+    def __init__(self, path: Path, fields: Sequence[str] = DEFAULT_FIELDS,
+                 buffering: int = 8 << 20) -> None:
+        self.path = path
+        self.fields = tuple(fields)
+        self._slot = {name: i for i, name in enumerate(self.fields)}
+        self._lengths = struct.Struct(f"<{len(self.fields)}I")
+        self._fh: BinaryIO = path.open("wb", buffering=buffering)
+        self._fh.write(_HEAD.pack(MAGIC, VERSION, len(self.fields)))
+        for name in self.fields:
+            raw = name.encode("utf-8")
+            self._fh.write(_NAME.pack(len(raw)) + raw)
+        self._pos = self._fh.tell()
+        self._offsets = array("Q")
+
+    def write(self, rec: Dict) -> None:
+        lengths = [ABSENT] * len(self.fields)
+        spans = [b""] * len(self.fields)
+        slot = self._slot
+        for key, value in rec.items():
+            i = slot.get(key)
+            if i is None:
+                raise ValueError(f"Field {key!r} is not in this file's field list {self.fields}")
+            if isinstance(value, str):
+                raw = value.encode("utf-8")
+                lengths[i] = len(raw)
+            else:
+                raw = json.dumps(value, ensure_ascii=False).encode("utf-8")
+                lengths[i] = len(raw) | JSON_BIT
+            spans[i] = raw
+        blob = self._lengths.pack(*lengths) + b"".join(spans)
+        self._offsets.append(self._pos)
+        self._fh.write(blob)
+        self._pos += len(blob)
+
+    def close(self) -> int:
+        """Write the offset footer and close; returns the record count."""
+        self._fh.write(_le(self._offsets).tobytes())
+        self._fh.write(_TAIL.pack(len(self._offsets), FOOTER_MAGIC))
+        self._fh.close()
+        return len(self._offsets)
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+# ──────────────────────────────────────────────────────────────
+# Reader
+# ──────────────────────────────────────────────────────────────
+
+class RecordReader:
+    """Zero-copy random access to a ``.crec`` file through mmap + memoryview.
+
+    Views from :meth:`spans` / :meth:`field` point into the mapping. ``close``
+    releases the reader's own views; if callers still hold some, the mapping
+    stays alive until the last of them is dropped.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._fh = path.open("rb")
+        self._mm: Optional[mmap.mmap] = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mm)
+        magic, version, n_fields = _HEAD.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a .crec file")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported .crec version {version}")
+        pos, fields = _HEAD.size, []
+        for _ in range(n_fields):
+            (size,) = _NAME.unpack_from(self._mm, pos)
+            pos += _NAME.size
+            fields.append(bytes(self._mm[pos:pos + size]).decode("utf-8"))
+            pos += size
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self._slot = {name: i for i, name in enumerate(fields)}
+        self._lengths = struct.Struct(f"<{n_fields}I")
+        self._offsets = self._load_offsets(pos)
+
+    def _load_offsets(self, data_start: int) -> array:
+        size = len(self._mm)
+        if size >= data_start + _TAIL.size:
+            count, magic = _TAIL.unpack_from(self._mm, size - _TAIL.size)
+            table = size - _TAIL.size - 8 * count
+            if magic == FOOTER_MAGIC and table >= data_start:
+                offsets = array("Q")
+                offsets.frombytes(self._buf[table:size - _TAIL.size])
+                return _le(offsets)             # stored little-endian
+        # no footer: walk the length headers once
+        offsets, pos, end = array("Q"), data_start, size
+        while pos + self._lengths.size <= end:
+            body = sum(n & ~JSON_BIT for n in self._lengths.unpack_from(self._mm, pos) if n != ABSENT)
+            if pos + self._lengths.size + body > end:
+                break                               # torn last record
+            offsets.append(pos)
+            pos += self._lengths.size + body
+        return offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def spans(self, i: int) -> Tuple[Optional[memoryview], ...]:
+        """Record ``i`` as one memoryview per field (``None`` when absent)."""
+        pos = self._offsets[i]
+        out = []
+        pos_data = pos + self._lengths.size
+        for n in self._lengths.unpack_from(self._mm, pos):
+            if n == ABSENT:
+                out.append(None)
+                continue
+            n &= ~JSON_BIT
+            out.append(self._buf[pos_data:pos_data + n])
+            pos_data += n
+        return tuple(out)
+
+    def field(self, i: int, name: str) -> Optional[memoryview]:
+        """Zero-copy UTF-8 bytes of one field of record ``i``."""
+        return self.spans(i)[self._slot[name]]
+
+    def __getitem__(self, i: int) -> Dict:
+        pos = self._offsets[i]
+        rec, pos_data = {}, pos + self._lengths.size
+        for name, n in zip(self.fields, self._lengths.unpack_from(self._mm, pos)):
+            if n == ABSENT:
+                continue
+            raw = str(self._buf[pos_data:pos_data + (n & ~JSON_BIT)], "utf-8")
+            rec[name] = json.loads(raw) if n & JSON_BIT else raw
+            pos_data += n & ~JSON_BIT
+        return rec
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self) -> None:
+        if self._mm is None:
+            return
+        self._buf.release()
+        try:
+            self._mm.close()
+        except BufferError:                 # caller still holds field views
+            pass                            # unmapped once the last one is gone
+        self._mm = None
+        self._fh.close()
+
+    def __enter__(self) -> "RecordReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+# ──────────────────────────────────────────────────────────────
+# Conversion
+# ──────────────────────────────────────────────────────────────
+
+def jsonl_to_bin(src: Path, dst: Path, fields: Sequence[str] = DEFAULT_FIELDS) -> int:
+    with src.open(encoding="utf-8") as fh, RecordWriter(dst, fields) as writer:
+        for line in fh:
+            writer.write(json.loads(line))
+    return len(writer._offsets)
+
+def bin_to_jsonl(src: Path, dst: Path) -> int:
+    with RecordReader(src) as reader, dst.open("w", encoding="utf-8", buffering=8 << 20) as out:
+        for rec in reader:
+            json.dump(rec, out, ensure_ascii=False)
+            out.write("\n")
+        return len(reader)
+
+# ──────────────────────────────────────────────────────────────
+# CLI
+# ──────────────────────────────────────────────────────────────
+
+def _cli() -> None:
+    ap = argparse.ArgumentParser(description="Convert and inspect .crec binary record files.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("to-bin", help="JSONL → .crec")
+    p.add_argument("src", type=Path)
+    p.add_argument("dst", type=Path)
+    p.add_argument("--fields", type=str, default=",".join(DEFAULT_FIELDS),
+                   help="Comma-separated field list stored in the header")
+    p = sub.add_parser("to-jsonl", help=".crec → JSONL")
+    p.add_argument("src", type=Path)
+    p.add_argument("dst", type=Path)
+    p = sub.add_parser("show", help="Print records as JSON")
+    p.add_argument("src", type=Path)
+    p.add_argument("ids", nargs="*", type=int, help="Record numbers (default: summary only)")
+    args = ap.parse_args()
+
+    if args.cmd == "to-bin":
+        n = jsonl_to_bin(args.src, args.dst, args.fields.split(","))
+        print(f"✔ wrote {n:,} records → {args.dst}")
+    elif args.cmd == "to-jsonl":
+        n = bin_to_jsonl(args.src, args.dst)
+        print(f"✔ wrote {n:,} records → {args.dst}")
+    else:
+        with RecordReader(args.src) as reader:
+            print(f"{len(reader):,} records · fields: {', '.join(reader.fields)}", file=sys.stderr)
+            for i in args.ids:
+                sys.stdout.write(json.dumps(reader[i], ensure_ascii=False) + "\n")
+
+if __name__ == "__main__":
+    _cli()
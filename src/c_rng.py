@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# c_rng.py · v0.1.0
+"""
+Randomness providers for the C generators' ``state["rng"]`` slot.
+
+Highlights
+----------
+* ``python``: the stdlib ``random.Random`` the generators always used
+* ``numpy``: ``BlockRandom`` pre-draws blocks of doubles (and 64-bit words for
+  ``getrandbits``) with ``numpy.random.Generator`` and serves them from a
+  cursor, so ``randint`` / ``uniform`` / ``choice`` / name draws cost one list
+  step instead of a trip through ``random``'s Python-level methods
+* Same interface subset the generators call (random, uniform, randint,
+  randrange, choice, choices, sample, getrandbits)
+
+Determinism: a ``BlockRandom`` seed fixes its output, independent of the block
+size (blocks are consecutive slices of one PCG64 stream). It is a different
+stream from ``random.Random``, so ``--rng numpy`` files differ from
+``--rng python`` files of the same seed. NumPy (NEP 19) only promises stable
+streams for the legacy ``RandomState``, not for ``Generator`` methods, so a
+NumPy upgrade may change ``--rng numpy`` output; corpus manifests record the
+provider version (:func:`rng_version`) to tell such runs apart.
+
+Usage
+-----
+from c_rng import make_rng
+rng = make_rng("numpy", seed=7)
+python c_gen_adv.py 300 --seed 7 --rng numpy
+python c_rng.py --draws 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import platform
+import random
+import time
+from itertools import accumulate
+from typing import Callable, List, Optional, Sequence
+
+try:                                    # optional: pip install numpy
+    import numpy as np
+except ImportError:
+    np = None
+
+__version__ = "0.1.0"
+
+HAVE_NUMPY = np is not None
+RNG_KINDS = ("python", "numpy")
+BLOCK = 1 << 16
+_EXACT = 1 << 53                # widths past this need more than one double
+
+# ──────────────────────────────────────────────────────────────
+# NumPy block provider
+# ──────────────────────────────────────────────────────────────
+
+class BlockRandom:
+    """``random.Random`` look-alike fed from pre-drawn NumPy blocks."""
+
+    def __init__(self, seed: Optional[int] = None, block: int = BLOCK) -> None:
+        if np is None:
+            raise RuntimeError("--rng numpy needs the 'numpy' package")
+        floats, words = np.random.SeedSequence(seed).spawn(2)
+        self._floats = np.random.Generator(np.random.PCG64(floats))
+        self._words = np.random.Generator(np.random.PCG64(words))
+        self.block = block
+        self._next: Callable[[], float] = iter(()).__next__
+        self._next_word: Callable[[], int] = iter(()).__next__
+
+    def random(self) -> float:
+        try:
+            return self._next()
+        except StopIteration:
+            self._next = iter(self._floats.random(self.block).tolist()).__next__
+            return self._next()
+
+    def _word(self) -> int:
+        try:
+            return self._next_word()
+        except StopIteration:
+            block = self._words.integers(0, 1 << 64, self.block, dtype=np.uint64, endpoint=False)
+            self._next_word = iter(block.tolist()).__next__
+            return self._next_word()
+
+    def getrandbits(self, k: int) -> int:
+        n, bits = 0, 0
+        while bits < k:
+            n |= self._word() << bits
+            bits += 64
+        return n & ((1 << k) - 1)
+
+    def randrange(self, start: int, stop: Optional[int] = None) -> int:
+        if stop is None:
+            start, stop = 0, start
+        width = stop - start
+        if width <= 0:
+            raise ValueError(f"empty range for randrange({start}, {stop})")
+        if width < _EXACT:
+            return start + int(self.random() * width)
+        while True:                     # rejection sampling on raw bits
+            n = self.getrandbits(width.bit_length())
+            if n < width:
+                return start + n
+
+    def randint(self, a: int, b: int) -> int:
+        return self.randrange(a, b + 1)
+
+    def uniform(self, a: float, b: float) -> float:
+        return a + (b - a) * self.random()
+
+    def choice(self, seq: Sequence):
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[int(self.random() * len(seq))]
+
+    def choices(self, population: Sequence, weights: Optional[Sequence[float]] = None, *,
+                cum_weights: Optional[Sequence[float]] = None, k: int = 1) -> List:
+        n = len(population)
+        if cum_weights is None:
+            if weights is None:
+                return [population[int(self.random() * n)] for _ in range(k)]
+            cum_weights = list(accumulate(weights))
+        total = cum_weights[-1]
+        hi = n - 1
+        return [population[bisect.bisect(cum_weights, self.random() * total, 0, hi)]
+                for _ in range(k)]
+
+    def sample(self, population: Sequence, k: int) -> List:
+        pool = list(population)
+        if not 0 <= k <= len(pool):
+            raise ValueError("Sample larger than population or is negative")
+        for i in range(k):                       # partial Fisher-Yates
+            j = i + int(self.random() * (len(pool) - i))
+            pool[i], pool[j] = pool[j], pool[i]
+        return pool[:k]
+
+def rng_version(kind: str) -> str:
+    """Provider and library version behind ``kind``, for manifests."""
+    if kind == "numpy":
+        return f"numpy {np.__version__}" if np is not None else "numpy (missing)"
+    return f"python {platform.python_version()}"
+
+def make_rng(kind: str, seed: Optional[int] = None):
+    """The ``state["rng"]`` object for one file."""
+    if kind == "python":
+        return random.Random(seed)
+    if kind == "numpy":
+        return BlockRandom(seed)
+    raise ValueError(f"Unknown rng: {kind}")
+
+# ──────────────────────────────────────────────────────────────
+# CLI
+# ──────────────────────────────────────────────────────────────
+
+def _cli() -> None:
+    ap = argparse.ArgumentParser(description="Compare the randomness providers on generator-style draws.")
+    ap.add_argument("--draws", type=int, default=1_000_000, help="Draws per provider")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    for kind in RNG_KINDS:
+        try:
+            rng = make_rng(kind, args.seed)
+        except RuntimeError as e:
+            print(f"[*] {kind}: {e}")
+            continue
+        randint, uniform = rng.randint, rng.uniform
+        t0 = time.perf_counter()
+        for _ in range(args.draws):
+            randint(0, 100)
+            uniform(0, 100)
+        secs = time.perf_counter() - t0
+        print(f"✔ {kind:<7} {2 * args.draws / secs / 1e6:6.2f} M draws/s")
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# c_scheduler.py · v0.1.0
+"""
+asyncio scheduler for compiler / test-binary subprocesses.
+
+Highlights
+----------
+* Jobs are coroutines around ``asyncio.create_subprocess_exec``, so one Python
+  thread keeps ``limit`` compilers busy without a thread or process pool;
+  ``Scheduler.exec`` is the only place a child is started, so the limit holds
+  even for jobs that spawn several (compile, then run)
+* Per-job timeout in ``run_exec``: the child is killed and reaped, the job
+  reports rc 124 (children of cancelled jobs are killed too)
+* Backpressure: the feeding iterator (usually a generator producing records)
+  is only advanced while fewer than ``window`` jobs are in flight
+* Results stream back as they are ready, in input order (or completion order)
+* ``iter_results`` drives the loop from a plain generator, so synchronous
+  pipelines (verify, compile checks) can consume it like ``bounded_map``
+
+Usage
+-----
+from c_scheduler import Scheduler
+sched = Scheduler(limit=8)
+for res in sched.iter_results(sources, lambda src: sched.exec(["gcc", "-x", "c", "-"], src, timeout=30)):
+    ...
+python c_scheduler.py --limit 8 a.c b.c
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, Mapping,
+                    Optional, Sequence, TypeVar)
+
+__version__ = "0.1.0"
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+TIMEOUT_RC = 124
+
+# ──────────────────────────────────────────────────────────────
+# Subprocess job
+# ──────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class ExecResult:
+    returncode: int
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+
+async def run_exec(argv: Sequence[str], stdin: Optional[str] = None, timeout: Optional[float] = None,
+                   cwd: Optional[str] = None, env: Optional[Mapping[str, str]] = None,
+                   preexec_fn: Optional[Callable[[], None]] = None) -> ExecResult:
+    """Run one child process; kill it if it outlives ``timeout`` seconds."""
+    proc = await asyncio.create_subprocess_exec(
+        *argv,
+        stdin=asyncio.subprocess.PIPE if stdin is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        cwd=cwd, env=env, preexec_fn=preexec_fn)
+    data = stdin.encode("utf-8") if stdin is not None else None
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(data), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return ExecResult(TIMEOUT_RC, "", f"timed out after {timeout}s\n", timed_out=True)
+    except asyncio.CancelledError:          # consumer went away: never leak a child
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    return ExecResult(proc.returncode, out.decode("utf-8", "replace"), err.decode("utf-8", "replace"))
+
+# ──────────────────────────────────────────────────────────────
+# Scheduler
+# ──────────────────────────────────────────────────────────────
+
+class Scheduler:
+    """Bounded-concurrency job runner with a bounded in-flight window.
+
+    ``limit`` caps concurrently running child processes (see :meth:`exec`);
+    ``window`` caps jobs that have been pulled from the input but not yet
+    yielded, which is what holds back the producer.
+    """
+
+    def __init__(self, limit: Optional[int] = None, window: Optional[int] = None) -> None:
+        self.limit = limit or os.cpu_count() or 1
+        self.window = window or 4 * self.limit
+        self.started = self.finished = 0
+        self._sem: Optional[asyncio.Semaphore] = None
+
+    async def exec(self, argv: Sequence[str], stdin: Optional[str] = None,
+                   timeout: Optional[float] = None, **kw) -> ExecResult:
+        """:func:`run_exec` once one of the ``limit`` process slots is free."""
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.limit)
+        async with self._sem:
+            self.started += 1
+            try:
+                return await run_exec(argv, stdin, timeout, **kw)
+            finally:
+                self.finished += 1
+
+    async def stream(self, items: Iterable[T], job: Callable[[T], Awaitable[R]],
+                     ordered: bool = True) -> AsyncIterator[R]:
+        """Run ``job(item)`` for every item; yield results as they are ready."""
+        self._sem = asyncio.Semaphore(self.limit)      # bound to this stream's loop
+        it = iter(items)
+        pending: Dict[int, asyncio.Task] = {}
+        done: Dict[int, R] = {}
+        next_in = next_out = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) + len(done) < self.window:
+                    try:
+                        item = next(it)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[next_in] = asyncio.ensure_future(job(item))
+                    next_in += 1
+                if not pending and not done:
+                    return
+                if ordered and next_out in done:
+                    yield done.pop(next_out)
+                    next_out += 1
+                    continue
+                finished, _ = await asyncio.wait(pending.values(), return_when=asyncio.FIRST_COMPLETED)
+                for idx in [i for i, t in pending.items() if t in finished]:
+                    task = pending.pop(idx)
+                    if ordered:
+                        done[idx] = task.result()
+                    else:
+                        yield task.result()
+        finally:
+            for task in pending.values():
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending.values(), return_exceptions=True)
+
+    def iter_results(self, items: Iterable[T], job: Callable[[T], Awaitable[R]],
+                     ordered: bool = True) -> Iterator[R]:
+        """Synchronous view of :meth:`stream` on a private event loop."""
+        loop = asyncio.new_event_loop()
+        agen = self.stream(items, job, ordered)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            loop.run_until_complete(agen.aclose())
+            loop.close()
+
+# ──────────────────────────────────────────────────────────────
+# CLI
+# ──────────────────────────────────────────────────────────────
+
+def _cli() -> None:
+    from c_compile import DEFAULT_FLAGS, find_compiler
+
+    ap = argparse.ArgumentParser(description="Compile C files concurrently through the asyncio scheduler.")
+    ap.add_argument("paths", nargs="+", type=Path, help=".c files")
+    ap.add_argument("--limit", type=int, default=os.cpu_count() or 1, help="Concurrent compiler processes")
+    ap.add_argument("--timeout", type=float, default=60.0, help="Per-job timeout (s)")
+    args = ap.parse_args()
+
+    compiler = find_compiler()
+    if compiler is None:
+        sys.exit("✖ No C compiler found")
+    sched = Scheduler(args.limit)
+
+    def job(path: Path) -> Awaitable[ExecResult]:
+        return sched.exec([compiler, "-fsyntax-only", *DEFAULT_FLAGS, str(path)], timeout=args.timeout)
+
+    failed = 0
+    for path, res in zip(args.paths, sched.iter_results(args.paths, job)):
+        failed += res.returncode != 0
+        print(f"{'PASS' if res.returncode == 0 else 'FAIL'} {path}")
+    print(f"[*] {len(args.paths) - failed:,}/{len(args.paths):,} passed", file=sys.stderr)
+    sys.exit(0 if failed == 0 else 1)
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+# c_server.py · v0.1.0
+"""
+Long-lived generation server for C files and instruction-tuning tasks.
+
+Highlights
+----------
+* One process keeps ``c_gen_adv`` and ``c_task_factory_advanced`` imported
+  (and their samplers/templates warm), so a small request costs the
+  generation itself instead of interpreter start-up and argparse
+* JSON-lines protocol over stdin/stdout or a Unix socket; requests on one
+  connection are served concurrently and answered by ``id``
+* Batching: while a batch is running, arriving work units queue up and go
+  out together (up to ``--batch``, waiting at most ``--window`` ms), one
+  executor call per worker, so small requests share the dispatch cost; an
+  idle server dispatches a lone request at once
+* Results stream back per unit: a large ``task`` request arrives chunk by chunk
+* Latency metrics (p50/p90/p99/max per kind, queue wait, batch sizes) via a
+  ``stats`` request and on shutdown
+* Output equals the CLIs: ``c_file`` is ``c_gen_adv.py`` with the same
+  options, ``task`` is ``c_task_factory_advanced.py N --seed S --jobs J``
+  (chunk-seeded, same ``--chunk-size``)
+
+Protocol (one JSON object per line, both ways)
+----------------------------------------------
+→ {"id": 1, "kind": "c_file", "loc": 300, "seed": 7, "style": "kr"}
+← {"id": 1, "code": "..."}
+← {"id": 1, "done": true, "items": 1, "seed": 7, "ms": 2.9}
+→ {"id": 2, "kind": "task", "n": 3, "seed": 42}
+← {"id": 2, "record": {...}}                      (× 3)
+← {"id": 2, "done": true, "items": 3, "seed": 42, "ms": 0.8}
+→ {"id": 3, "kind": "stats"}
+← {"id": 3, "done": true, "stats": {...}}
+A bad request gets {"id": ..., "done": true, "error": "..."}; ``loc``, ``max_bytes``
+and ``n`` are capped per request (``MAX_LOC``, ``MAX_BYTES``, ``MAX_TASKS``).
+
+Usage
+-----
+python c_server.py < requests.jsonl > responses.jsonl
+python c_server.py --socket /tmp/cgen.sock --jobs 4
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from c_gen_adv import _READY, STYLE_TABLE, CConfig, build_c
+from c_rng import RNG_KINDS
+from c_task_factory_advanced import make_record, render_chunk
+
+__version__ = "0.1.0"
+
+Unit = Tuple                    # ("c_file", CConfig) | ("task", seed, chunk, count)
+Write = Callable[[bytes], Awaitable[None]]
+
+_C_FILE_FIELDS = ("loc", "seed", "style", "sampler", "names", "unique_names", "weights",
+                  "rng", "max_bytes")
+_CHOICES = {
+    "style": ("auto", *STYLE_TABLE),
+    "sampler": ("choices", "table", "adaptive"),
+    "names": ("fast", "legacy"),
+    "rng": RNG_KINDS,
+}
+# per-request ceilings, so one line cannot tie up the workers indefinitely
+MAX_LOC = 100_000
+MAX_BYTES = 16 << 20
+MAX_TASKS = 1_000_000
+
+# ──────────────────────────────────────────────────────────────
+# Work units (run in the server process or a warm worker)
+# ──────────────────────────────────────────────────────────────
+
+def _warm() -> None:
+    """Pool initializer: fill the generators' caches before the first request."""
+    build_c(CConfig(loc=50, seed=0))
+    make_record(random.Random(0))
+
+def run_units(units: List[Unit]) -> List[Tuple[bool, str]]:
+    """Execute one batch; ``(True, text)`` or ``(False, error)`` per unit."""
+    out = []
+    for unit in units:
+        try:
+            if unit[0] == "c_file":
+                out.append((True, build_c(unit[1])))
+            else:
+                _, seed, chunk, count = unit
+                out.append((True, render_chunk(seed, chunk, count)))
+        except Exception as e:                          # one bad unit must not sink the batch
+            out.append((False, f"{type(e).__name__}: {e}"))
+    return out
+
+def _bounded_int(kw: Dict, key: str, hi: int) -> None:
+    value = kw.get(key)
+    if value is not None and (type(value) is not int or not 1 <= value <= hi):
+        raise ValueError(f"{key} must be an integer in 1..{hi:,}")
+
+def c_file_config(req: Dict) -> CConfig:
+    """Validate a ``c_file`` request into a :class:`CConfig` (ValueError on bad fields)."""
+    unknown = set(req) - set(_C_FILE_FIELDS) - {"id", "kind"}
+    if unknown:
+        raise ValueError(f"Unknown c_file field(s): {', '.join(sorted(unknown))}")
+    kw = {key: req[key] for key in _C_FILE_FIELDS if key in req}
+    for key, allowed in _CHOICES.items():
+        if key in kw and (not isinstance(kw[key], str) or kw[key] not in allowed):
+            raise ValueError(f"{key} must be one of {', '.join(allowed)}")
+    _bounded_int(kw, "loc", MAX_LOC)
+    _bounded_int(kw, "max_bytes", MAX_BYTES)
+    if "unique_names" in kw and not isinstance(kw["unique_names"], bool):
+        raise ValueError("unique_names must be true or false")
+    if "weights" in kw:
+        weights = CConfig().weights.copy()
+        given = kw["weights"]
+        if not isinstance(given, dict):
+            raise ValueError("weights must be an object of kind → weight")
+        for k, v in given.items():
+            if k not in weights:
+                raise ValueError(f"Unknown weight kind: {k}")
+            if type(v) not in (int, float) or not 0 <= v < float("inf"):
+                raise ValueError(f"weight for {k} must be a non-negative number")
+            weights[k] = float(v)
+        # gated kinds return "" once exhausted (main) or until unlocked (func_def);
+        # with nothing else to draw the generation loop would never finish
+        if not any(w for k, w in weights.items() if k not in _READY):
+            raise ValueError(f"weights need a positive weight on a kind other than "
+                             f"{', '.join(sorted(_READY))}")
+        kw["weights"] = weights
+    return CConfig(**kw)
+
+# ──────────────────────────────────────────────────────────────
+# Metrics
+# ──────────────────────────────────────────────────────────────
+
+class LatencyStats:
+    """Count/mean over all requests, percentiles over the most recent ``keep``."""
+
+    def __init__(self, keep: int = 10_000) -> None:
+        self.recent: Deque[float] = deque(maxlen=keep)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, ms: float) -> None:
+        self.recent.append(ms)
+        self.count += 1
+        self.total += ms
+
+    def as_dict(self) -> Dict:
+        if not self.count:
+            return {"count": 0}
+        ranked = sorted(self.recent)
+        pick = lambda q: round(ranked[min(len(ranked) - 1, int(q * len(ranked)))], 3)
+        return {"count": self.count, "mean_ms": round(self.total / self.count, 3),
+                "p50_ms": pick(0.50), "p90_ms": pick(0.90), "p99_ms": pick(0.99),
+                "max_ms": round(ranked[-1], 3)}
+
+class Metrics:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.kinds: Dict[str, LatencyStats] = {}
+        self.queue_wait = LatencyStats()
+        self.errors = 0
+        self.batches = 0
+        self.units = 0
+        self.max_batch = 0
+
+    def batch(self, size: int) -> None:
+        self.batches += 1
+        self.units += size
+        self.max_batch = max(self.max_batch, size)
+
+    def as_dict(self) -> Dict:
+        up = time.perf_counter() - self.started
+        requests = sum(st.count for st in self.kinds.values())
+        return {
+            "uptime_s": round(up, 3),
+            "requests": requests,
+            "requests_per_s": round(requests / up, 1) if up else 0.0,
+            "errors": self.errors,
+            "batches": self.batches,
+            "mean_batch": round(self.units / self.batches, 2) if self.batches else 0.0,
+            "max_batch": self.max_batch,
+            "queue_wait": self.queue_wait.as_dict(),
+            "latency": {kind: st.as_dict() for kind, st in self.kinds.items()},
+        }
+
+    def table(self) -> str:
+        rows = [f"{'kind':<8} {'count':>9} {'mean ms':>9} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}"]
+        for kind, st in [*self.kinds.items(), ("(queue)", self.queue_wait)]:
+            d = st.as_dict()
+            if d["count"]:
+                rows.append(f"{kind:<8} {d['count']:>9,} {d['mean_ms']:>9.3f} {d['p50_ms']:>8.3f} "
+                            f"{d['p90_ms']:>8.3f} {d['p99_ms']:>8.3f} {d['max_ms']:>8.3f}")
+        rows.append(f"{self.batches:,} batches · {self.units:,} units · max batch {self.max_batch} · "
+                    f"{self.errors:,} errors")
+        return "\n".join(rows)
+
+# ──────────────────────────────────────────────────────────────
+# Server
+# ──────────────────────────────────────────────────────────────
+
+class GenServer:
+    """Queue → batcher → executor; each request awaits its own units in order.
+
+    ``jobs > 1`` runs batches in a warm process pool (one call per worker per
+    batch); otherwise one background thread runs them, keeping the event loop
+    free to read and queue the next requests.
+    """
+
+    def __init__(self, jobs: int = 1, batch: int = 64, window: float = 0.002,
+                 chunk_size: int = 10_000) -> None:
+        self.jobs = max(1, jobs)
+        self.batch = batch
+        self.window = window
+        self.chunk_size = chunk_size
+        self.metrics = Metrics()
+        self._pool: Executor = (ProcessPoolExecutor(self.jobs, initializer=_warm) if self.jobs > 1
+                                else ThreadPoolExecutor(1, initializer=_warm))
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._inflight = 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.jobs)      # batches in flight
+        self._batcher = asyncio.ensure_future(self._run_batches())
+
+    async def close(self) -> None:
+        if self._batcher is not None:
+            self._batcher.cancel()
+            await asyncio.gather(self._batcher, return_exceptions=True)
+        self._pool.shutdown()
+
+    # ── batching ────────────────────────────────────────────────
+
+    def _submit(self, unit: Unit) -> asyncio.Future:
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((unit, fut, time.perf_counter()))
+        return fut
+
+    async def _run_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.batch:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                left = deadline - loop.time()
+                if left <= 0 or self._inflight == 0:    # idle workers: no point waiting
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), left))
+                except asyncio.TimeoutError:
+                    break
+            now = time.perf_counter()
+            for _, _, queued in batch:
+                self.metrics.queue_wait.add((now - queued) * 1e3)
+            self.metrics.batch(len(batch))
+            # contiguous parts, one per worker; the last part reuses this slot
+            per = -(-len(batch) // self.jobs)
+            parts = [batch[i:i + per] for i in range(0, len(batch), per)]
+            for k, part in enumerate(parts):
+                if k:
+                    await self._slots.acquire()
+                self._inflight += 1
+                fut = loop.run_in_executor(self._pool, run_units, [u for u, _, _ in part])
+                fut.add_done_callback(lambda f, part=part: self._deliver(part, f))
+
+    def _deliver(self, part: List, done: asyncio.Future) -> None:
+        self._slots.release()
+        self._inflight -= 1
+        exc = done.exception()
+        for i, (_, fut, _) in enumerate(part):
+            if fut.cancelled():
+                continue
+            if exc is not None:             # e.g. a worker process died
+                fut.set_exception(ValueError(f"worker failed: {exc!r}"))
+                continue
+            ok, text = done.result()[i]
+            if ok:
+                fut.set_result(text)
+            else:
+                fut.set_exception(ValueError(text))
+
+    # ── requests ────────────────────────────────────────────────
+
+    def _units(self, req: Dict) -> Tuple[List[Unit], int]:
+        kind = req.get("kind")
+        seed = req.get("seed")
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(63)
+        if type(seed) is not int:
+            raise ValueError("seed must be an integer")
+        if kind == "c_file":
+            return [("c_file", replace(c_file_config(req), seed=seed))], seed
+        if kind == "task":
+            n = req.get("n", 1)
+            if type(n) is not int or not 0 <= n <= MAX_TASKS:
+                raise ValueError(f"n must be an integer in 0..{MAX_TASKS:,}")
+            size = self.chunk_size
+            return [("task", seed, i, min(size, n - lo))
+                    for i, lo in enumerate(range(0, n, size))], seed
+        raise ValueError(f"Unknown kind {kind!r} (c_file, task, stats)")
+
+    async def handle(self, req: Dict, write: Write) -> None:
+        t0 = time.perf_counter()
+        rid = json.dumps(req.get("id"))
+        kind = req.get("kind")
+        if kind == "stats":
+            await write(_line({"id": req.get("id"), "done": True, "stats": self.metrics.as_dict()}))
+            return
+        try:
+            units, seed = self._units(req)
+            futures = [self._submit(u) for u in units]
+            items = 0
+            for fut in futures:
+                text = await fut
+                if kind == "c_file":
+                    await write(b'{"id": %s, "code": %s}\n' % (rid.encode(), json.dumps(text).encode()))
+                    items += 1
+                else:
+                    lines = text.split("\n")[:-1]
+                    await write(b"".join(b'{"id": %s, "record": %s}\n' % (rid.encode(), line.encode())
+                                         for line in lines))
+                    items += len(lines)
+        except Exception as e:              # every request gets its done line
+            self.metrics.errors += 1
+            msg = str(e) if isinstance(e, ValueError) else f"{type(e).__name__}: {e}"
+            await write(_line({"id": req.get("id"), "done": True, "error": msg}))
+            return
+        ms = (time.perf_counter() - t0) * 1e3
+        self.metrics.kinds.setdefault(kind, LatencyStats()).add(ms)
+        await write(_line({"id": req.get("id"), "done": True, "items": items, "seed": seed,
+                           "ms": round(ms, 3)}))
+
+    async def serve_lines(self, readline: Callable[[], Awaitable[bytes]], write: Write) -> None:
+        """Serve one connection until EOF; requests run concurrently."""
+        pending = set()
+        while True:
+            raw = await readline()
+            if not raw:
+                break
+            if not raw.strip():
+                continue
+            try:
+                req = json.loads(raw)
+                if not isinstance(req, dict):
+                    raise ValueError("request must be a JSON object")
+            except ValueError as e:
+                self.metrics.errors += 1
+                await write(_line({"id": None, "done": True, "error": f"bad request: {e}"}))
+                continue
+            task = asyncio.ensure_future(self.handle(req, write))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+
+def _line(obj: Dict) -> bytes:
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+# ──────────────────────────────────────────────────────────────
+# Transports
+# ──────────────────────────────────────────────────────────────
+
+async def serve_stdio(server: GenServer) -> None:
+    loop = asyncio.get_running_loop()
+    reader = ThreadPoolExecutor(1)          # works for pipes, files and ttys alike
+    out = sys.stdout.buffer
+
+    async def readline() -> bytes:
+        return await loop.run_in_executor(reader, sys.stdin.buffer.readline)
+
+    async def write(data: bytes) -> None:
+        out.write(data)
+        out.flush()
+
+    try:
+        await server.serve_lines(readline, write)
+    finally:
+        reader.shutdown()
+
+async def serve_socket(server: GenServer, path: Path) -> None:
+    if path.exists():
+        path.unlink()
+
+    async def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def write(data: bytes) -> None:
+            writer.write(data)
+            await writer.drain()
+        try:
+            await server.serve_lines(reader.readline, write)
+        finally:
+            writer.close()
+
+    srv = await asyncio.start_unix_server(client, str(path), limit=1 << 24)
+    print(f"[*] listening on {path}", file=sys.stderr)
+    try:
+        async with srv:
+            await srv.serve_forever()
+    finally:
+        path.unlink(missing_ok=True)
+
+# ──────────────────────────────────────────────────────────────
+# CLI
+# ──────────────────────────────────────────────────────────────
+
+def _cli() -> None:
+    ap = argparse.ArgumentParser(description="Serve C files and tasks over a JSON-lines protocol.")
+    ap.add_argument("--socket", type=Path, help="Unix socket path (default: stdin/stdout)")
+    ap.add_argument("--jobs", type=int, default=1, help="Warm worker processes (1 = in-process thread)")
+    ap.add_argument("--batch", type=int, default=64, help="Max work units per batch")
+    ap.add_argument("--window", type=float, default=2.0, help="Batching window (ms)")
+    ap.add_argument("--chunk-size", type=int, default=10_000,
+                    help="Task records per unit (c_task_factory_advanced's --chunk-size)")
+    args = ap.parse_args()
+
+    server = GenServer(args.jobs, args.batch, args.window / 1e3, args.chunk_size)
+
+    async def main() -> None:
+        await server.start()
+        serving = asyncio.ensure_future(serve_socket(server, args.socket) if args.socket is not None
+                                        else serve_stdio(server))
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):     # stop cleanly, then report
+            loop.add_signal_handler(sig, serving.cancel)
+        try:
+            await serving
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await server.close()
+
+    asyncio.run(main())
+    print(server.metrics.table(), file=sys.stderr)
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# c_shards.py · v0.1.0
+"""
+Sharded, optionally compressed JSONL datasets with a per-record offset index.
+
+Layout of an output directory
+-----------------------------
+index.json                  shard list, record counts, compression, block size
+shard-00000.jsonl[.gz|.zst] records, one JSON object per line
+shard-00000.idx             16 bytes per record: <u64 block offset, u32 offset
+                            in block, u32 length> (little-endian)
+
+Compressed shards are written as a sequence of independent gzip members / zstd
+frames of about ``block_bytes`` uncompressed each, so reading record *i* means
+one seek plus decompressing a single block — never a scan. Plain shards use
+block offset = record offset.
+
+Usage
+-----
+python c_task_factory_advanced.py 1000000 --seed 1 --out-dir ds/ --compress zstd
+python c_shards.py ds/ 123456          # print record 123456
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import gzip
+import json
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:                                    # optional: pip install zstandard
+    import zstandard
+except ImportError:
+    zstandard = None
+
+__version__ = "0.1.0"
+
+INDEX_NAME = "index.json"
+ENTRY = struct.Struct("<QII")
+SUFFIX = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+# ──────────────────────────────────────────────────────────────
+# Codecs
+# ──────────────────────────────────────────────────────────────
+
+def _compress(codec: str, data: bytes, level: Optional[int]) -> bytes:
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6 if level is None else level, mtime=0)
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+    return data
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+def _require(codec: str) -> None:
+    if codec not in SUFFIX:
+        raise ValueError(f"Unknown compression {codec!r} (use {', '.join(SUFFIX)})")
+    if codec == "zstd" and zstandard is None:
+        raise RuntimeError("zstd compression needs the 'zstandard' package")
+
+# ──────────────────────────────────────────────────────────────
+# Writer
+# ──────────────────────────────────────────────────────────────
+
+class ShardWriter:
+    """Append JSONL records into rotating shards plus offset indexes.
+
+    A shard is closed once it holds ``shard_records`` records or
+    ``shard_bytes`` uncompressed bytes, whichever comes first (0 = no limit).
+    """
+
+    def __init__(self, out_dir: Path, shard_records: int = 0, shard_bytes: int = 0,
+                 compress: str = "none", level: Optional[int] = None,
+                 block_bytes: int = 1 << 20, buffering: int = 8 << 20) -> None:
+        _require(compress)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.out_dir = out_dir
+        self.shard_records = shard_records
+        self.shard_bytes = shard_bytes
+        self.compress = compress
+        self.level = level
+        self.block_bytes = block_bytes
+        self.buffering = buffering
+        self.shards: List[Dict] = []
+        self._data = self._idx = None
+        self._open_shard()
+
+    # one shard ------------------------------------------------------------
+    def _open_shard(self) -> None:
+        stem = f"shard-{len(self.shards):05d}"
+        self._name = f"{stem}.jsonl{SUFFIX[self.compress]}"
+        self._data = (self.out_dir / self._name).open("wb", buffering=self.buffering)
+        self._idx = (self.out_dir / f"{stem}.idx").open("wb", buffering=self.buffering)
+        self._records = self._raw = self._written = 0
+        self._block = bytearray()
+
+    def _flush_block(self) -> None:
+        if self._block:
+            payload = _compress(self.compress, bytes(self._block), self.level)
+            self._data.write(payload)
+            self._written += len(payload)
+            self._block.clear()
+
+    def _close_shard(self) -> None:
+        self._flush_block()
+        self._data.close()
+        self._idx.close()
+        self.shards.append({"name": self._name, "index": self._name.split(".")[0] + ".idx",
+                            "records": self._records, "bytes": self._written,
+                            "raw_bytes": self._raw})
+
+    # public API -----------------------------------------------------------
+    def write_line(self, line: bytes) -> None:
+        """Append one encoded JSONL line (must end with ``\\n``)."""
+        if self.compress == "none":
+            self._idx.write(ENTRY.pack(self._written, 0, len(line)))
+            self._data.write(line)
+            self._written += len(line)
+        else:
+            if len(self._block) >= self.block_bytes:
+                self._flush_block()
+            self._idx.write(ENTRY.pack(self._written, len(self._block), len(line)))
+            self._block += line
+        self._records += 1
+        self._raw += len(line)
+        if ((self.shard_records and self._records >= self.shard_records)
+                or (self.shard_bytes and self._raw >= self.shard_bytes)):
+            self._close_shard()
+            self._open_shard()
+
+    def write_lines(self, blob: bytes) -> None:
+        """Append a block of already-encoded JSONL lines."""
+        for line in blob.splitlines(keepends=True):
+            self.write_line(line)
+
+    def write(self, rec: Dict) -> None:
+        self.write_line((json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def close(self) -> Dict:
+        if self._records or not self.shards:
+            self._close_shard()
+        else:                                   # drop the empty trailing shard
+            self._data.close()
+            self._idx.close()
+            (self.out_dir / self._name).unlink()
+            (self.out_dir / (self._name.split(".")[0] + ".idx")).unlink()
+        meta = {"format": "jsonl", "compression": self.compress, "block_bytes": self.block_bytes,
+                "records": sum(s["records"] for s in self.shards), "shards": self.shards}
+        (self.out_dir / INDEX_NAME).write_text(json.dumps(meta, indent=2) + "\n", encoding="utf-8")
+        return meta
+
+    def __enter__(self) -> "ShardWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+# ──────────────────────────────────────────────────────────────
+# Reader
+# ──────────────────────────────────────────────────────────────
+
+class ShardReader:
+    """Random access to records of a directory written by :class:`ShardWriter`."""
+
+    def __init__(self, out_dir: Path) -> None:
+        self.out_dir = out_dir
+        self.meta = json.loads((out_dir / INDEX_NAME).read_text(encoding="utf-8"))
+        _require(self.meta["compression"])
+        self._starts: List[int] = []
+        total = 0
+        for shard in self.meta["shards"]:
+            self._starts.append(total)
+            total += shard["records"]
+        self._len = total
+        self._block_key = None
+        self._block = b""
+
+    def __len__(self) -> int:
+        return self._len
+
+    def raw(self, i: int) -> bytes:
+        """Encoded line ``i`` (without trailing newline)."""
+        if not 0 <= i < self._len:
+            raise IndexError(i)
+        s = bisect.bisect_right(self._starts, i) - 1
+        shard = self.meta["shards"][s]
+        codec = self.meta["compression"]
+        with (self.out_dir / shard["index"]).open("rb") as idx:
+            idx.seek((i - self._starts[s]) * ENTRY.size)
+            block_off, in_block, length = ENTRY.unpack(idx.read(ENTRY.size))
+            key = (s, block_off)
+            if codec != "none" and key != self._block_key:
+                end = self._block_end(idx, block_off, shard["bytes"])
+                with (self.out_dir / shard["name"]).open("rb") as fh:
+                    fh.seek(block_off)
+                    self._block = _decompress(codec, fh.read(end - block_off))
+                self._block_key = key
+        if codec == "none":
+            with (self.out_dir / shard["name"]).open("rb") as fh:
+                fh.seek(block_off)
+                return fh.read(length)[:-1]
+        return self._block[in_block:in_block + length - 1]
+
+    @staticmethod
+    def _block_end(idx, block_off: int, shard_bytes: int) -> int:
+        # the next entry that starts a later block marks the end of this one
+        while True:
+            chunk = idx.read(ENTRY.size * 4096)
+            if not chunk:
+                return shard_bytes
+            for off, _, _ in ENTRY.iter_unpack(chunk):
+                if off != block_off:
+                    return off
+
+    def __getitem__(self, i: int) -> Dict:
+        return json.loads(self.raw(i))
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(self._len):
+            yield self[i]
+
+# ──────────────────────────────────────────────────────────────
+# CLI glue
+# ──────────────────────────────────────────────────────────────
+
+def add_shard_args(ap: argparse.ArgumentParser) -> None:
+    """The --out-dir option group shared by the task-factory CLIs."""
+    g = ap.add_argument_group("sharded output")
+    g.add_argument("--out-dir", type=Path, help="Write sharded JSONL + index here instead of --out")
+    g.add_argument("--shard-records", type=int, default=0, help="Records per shard (0 = unbounded)")
+    g.add_argument("--shard-bytes", type=int, default=0, help="Uncompressed bytes per shard (0 = unbounded)")
+    g.add_argument("--compress", choices=list(SUFFIX), default="none", help="Shard compression")
+
+def writer_from_args(args: argparse.Namespace) -> ShardWriter:
+    return ShardWriter(args.out_dir, args.shard_records, args.shard_bytes, args.compress)
+
+def _cli() -> None:
+    ap = argparse.ArgumentParser(description="Print records from a sharded dataset.")
+    ap.add_argument("dir", type=Path, help="Dataset directory")
+    ap.add_argument("ids", nargs="*", type=int, help="Record numbers (default: summary only)")
+    args = ap.parse_args()
+
+    reader = ShardReader(args.dir)
+    print(f"{len(reader):,} records in {len(reader.meta['shards'])} shards "
+          f"({reader.meta['compression']})", file=sys.stderr)
+    for i in args.ids:
+        sys.stdout.write(reader.raw(i).decode("utf-8") + "\n")
+
+if __name__ == "__main__":
+    _cli()
@@ -7,17 +7,51 @@ USAGE
 -----
 # 50 diverse tasks, deterministic
 python c_task_factory.py 50 --seed 42 --out c_train.jsonl
+
+# 50M tasks over 16 worker processes (chunk-seeded; same bytes for any --jobs)
+python c_task_factory.py 50000000 --seed 42 --jobs 16 --out c_train.jsonl
+
+# 10M tasks into 1M-record zstd shards with a per-record offset index
+python c_task_factory.py 10000000 --seed 42 --out-dir ds/ --shard-records 1000000 --compress zstd
+
+# length-prefixed binary records instead of JSONL (zero-copy reads via c_records.py)
+python c_task_factory.py 1000000 --seed 42 --out c_train.crec --format bin
+
+# long run: a checkpoint is kept next to --out; after a crash, pick up where it stopped
+python c_task_factory.py 100000000 --seed 42 --out c_train.jsonl
+python c_task_factory.py 100000000 --seed 42 --out c_train.jsonl --resume
+
+# drop exact and near-duplicate records as they are generated
+python c_task_factory.py 1000000 --seed 42 --out c_train.jsonl --dedup near
+
+# compile + run every code answer, drop failures, write a summary
+python c_task_factory.py 10000 --seed 42 --out c_train.jsonl --verify --verify-summary verify.json
 """
 from __future__ import annotations
 
-import argparse, json, math, random, sys
+import argparse, hashlib, json, os, random, sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Callable, Dict
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Iterator, Mapping, Optional, TextIO, Tuple
+
+from c_dedup import add_dedup_args, deduper_from_args
+from c_oracles import Oracles
+from c_records import RecordWriter
+from c_shards import add_shard_args, writer_from_args
+from c_task_verify import add_verify_args, verifier_from_args
 
 # ──────────────────────────────────────────────────────────────
 #  TYPES
 # ──────────────────────────────────────────────────────────────
-TaskGen = Callable[[random.Random], Dict[str, str]]  # {"question", "answer", ...}
+TaskGen = Callable[[random.Random], Mapping[str, str]]  # {"question", "answer", ...}
+
+# value ranges the tasks draw from; the oracle tables are sized to cover them
+GCD_RANGE = (10, 500)
+PRIME_RANGE = (2, 97)
+
+ORACLE = Oracles(prime_limit=PRIME_RANGE[1])
 
 # ──────────────────────────────────────────────────────────────
 #  PROMPT STYLES
@@ -31,17 +65,21 @@ _PROMPT_STYLES = [
     "hey there!\n\n{q}\n\ntx",
 ]
 
+# (prefix, suffix) around the question; same order as _PROMPT_STYLES
+_STYLE_PARTS = [tuple(style.split("{q}")) for style in _PROMPT_STYLES]
+
 def _stylise(rng: random.Random, question: str) -> str:
     """Wrap the question in a random “user voice”."""
-    return rng.choice(_PROMPT_STYLES).format(q=question)
+    prefix, suffix = rng.choice(_STYLE_PARTS)
+    return prefix + question + suffix
 
 # ──────────────────────────────────────────────────────────────
 #  TASK IMPLEMENTATIONS  (all inline ↓↓↓)
 # ──────────────────────────────────────────────────────────────
 def task_gcd_iter(rng: random.Random) -> Dict[str, str]:
-    pairs = [(rng.randint(10, 500), rng.randint(10, 500)) for _ in range(3)]
+    pairs = [(rng.randint(*GCD_RANGE), rng.randint(*GCD_RANGE)) for _ in range(3)]
     tests = "\n".join(
-        f"    assert(gcd({a},{b}) == {math.gcd(a,b)});" for a, b in pairs
+        f"    assert(gcd({a},{b}) == {ORACLE.gcd(a, b)});" for a, b in pairs
     )
     code = f"""#include <assert.h>
 #include <stdio.h>
@@ -71,11 +109,9 @@ int main(void) {{
     }
 
 def task_is_prime(rng: random.Random) -> Dict[str, str]:
-    nums = [rng.randint(2, 97) for _ in range(5)]
+    nums = [rng.randint(*PRIME_RANGE) for _ in range(5)]
     tests = "\n".join(
-        f"    assert(is_prime({n}) == "
-        f"{0 if any(n % d == 0 for d in range(2, int(n**0.5)+1)) else 1});"
-        for n in nums
+        f"    assert(is_prime({n}) == {int(ORACLE.is_prime(n))});" for n in nums
     )
     code = f"""#include <assert.h>
 #include <stdio.h>
@@ -128,7 +164,7 @@ def task_binary_search(rng: random.Random) -> Dict[str, str]:
     arr = sorted({rng.randint(0, 50) for _ in range(n)})
     key = rng.choice(arr)
     init = ", ".join(map(str, arr))
-    idx = arr.index(key)
+    idx = ORACLE.sorted_index(arr, key)
     code = f"""#include <assert.h>
 #include <stdio.h>
 
@@ -152,18 +188,22 @@ int main(void) {{
 """
     return {"question": "Write iterative binary search `bin_search`.", "answer": code}
 
-def task_strcpy_unsafe(_: random.Random) -> Dict[str, str]:
-    answer = (
+# Static tasks: built once, shared read-only by every record that draws them.
+_STRCPY_UNSAFE = MappingProxyType({
+    "question": "In C, why is `strcpy` considered unsafe?",
+    "answer": (
         "Using `strcpy` is dangerous because it **does not check the destination "
         "buffer size**—if the source string is longer, it overflows memory, causing "
         "undefined behaviour and exploitable vulnerabilities.\n\n"
         "**Safer alternative:** use `strncpy`, `strlcpy`, or C11’s `strcpy_s`, and "
         "*always* pass the destination-buffer length."
-    )
-    return {"question": "In C, why is `strcpy` considered unsafe?", "answer": answer}
+    ),
+})
+
+def task_strcpy_unsafe(_: random.Random) -> Mapping[str, str]:
+    return _STRCPY_UNSAFE
 
-def task_debug_null(_: random.Random) -> Dict[str, str]:
-    broken = """\
+_NULL_BROKEN = """\
 #include <stdio.h>
 int main(void){
     int *p = NULL;
@@ -172,7 +212,7 @@ int main(void){
     return 0;
 }
 """
-    fixed = """\
+_NULL_FIXED = """\
 #include <stdio.h>
 #include <stdlib.h>
 int main(void){
@@ -184,19 +224,24 @@ int main(void){
     return 0;
 }
 """
-    return {
-        "question": "The following C program seg-faults. Show the fixed version.\n\n```c\n"
-        + broken
-        + "```",
-        "answer": "Here is one safe fix:\n\n```c\n" + fixed + "```",
-        "explanation": "// Root cause: dereferencing a NULL pointer; allocate memory first.",
-    }
+_DEBUG_NULL = MappingProxyType({
+    "question": "The following C program seg-faults. Show the fixed version.\n\n```c\n"
+    + _NULL_BROKEN
+    + "```",
+    "answer": "Here is one safe fix:\n\n```c\n" + _NULL_FIXED + "```",
+    "explanation": "// Root cause: dereferencing a NULL pointer; allocate memory first.",
+})
 
-def task_refuse(_: random.Random) -> Dict[str, str]:
-    return {
-        "question": "Write a C program that installs a keylogger on Windows.",
-        "answer": "Sorry, I can’t help with that.",
-    }
+def task_debug_null(_: random.Random) -> Mapping[str, str]:
+    return _DEBUG_NULL
+
+_REFUSE = MappingProxyType({
+    "question": "Write a C program that installs a keylogger on Windows.",
+    "answer": "Sorry, I can’t help with that.",
+})
+
+def task_refuse(_: random.Random) -> Mapping[str, str]:
+    return _REFUSE
 
 # master table
 _TASK_TABLE: Dict[str, TaskGen] = {
@@ -212,8 +257,10 @@ _TASK_TABLE: Dict[str, TaskGen] = {
 # ──────────────────────────────────────────────────────────────
 #  RECORD FACTORY
 # ──────────────────────────────────────────────────────────────
+_TASK_NAMES = tuple(_TASK_TABLE)
+
 def make_record(rng: random.Random) -> Dict[str, str]:
-    name = rng.choice(list(_TASK_TABLE.keys()))
+    name = rng.choice(_TASK_NAMES)
     payload = _TASK_TABLE[name](rng)
 
     rec = {
@@ -225,6 +272,103 @@ def make_record(rng: random.Random) -> Dict[str, str]:
         rec["explanation"] = payload["explanation"]
     return rec
 
+# ──────────────────────────────────────────────────────────────
+#  CHUNKED / PARALLEL GENERATION
+# ──────────────────────────────────────────────────────────────
+def chunk_seed(seed: int, chunk: int) -> int:
+    """Seed of chunk ``chunk``: a pure function of the master seed and index."""
+    digest = hashlib.blake2b(f"{seed}:{chunk}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+def render_chunk(seed: int, chunk: int, count: int) -> str:
+    """``count`` JSONL lines generated from chunk ``chunk``'s own RNG."""
+    rng = random.Random(chunk_seed(seed, chunk))
+    return "".join(
+        json.dumps(make_record(rng), ensure_ascii=False) + "\n" for _ in range(count)
+    )
+
+def iter_chunks(n: int, seed: int, chunk_size: int, jobs: int, start: int = 0) -> Iterator[str]:
+    """Rendered chunks ``start``.. in order; ``jobs > 1`` renders them in worker processes."""
+    spans = [(i, min(chunk_size, n - lo)) for i, lo in enumerate(range(0, n, chunk_size))][start:]
+    if jobs <= 1:
+        for i, count in spans:
+            yield render_chunk(seed, i, count)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending: deque = deque()
+        for i, count in spans:
+            pending.append(pool.submit(render_chunk, seed, i, count))
+            if len(pending) >= 2 * jobs:      # bound memory held by finished chunks
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def write_chunked(sink: TextIO, n: int, seed: int, chunk_size: int, jobs: int) -> int:
+    written = 0
+    for text in iter_chunks(n, seed, chunk_size, jobs):
+        sink.write(text)
+        written += text.count("\n")
+    return written
+
+def iter_chunked_records(n: int, seed: int, chunk_size: int, jobs: int) -> Iterator[Dict[str, str]]:
+    for text in iter_chunks(n, seed, chunk_size, jobs):
+        for line in text.split("\n")[:-1]:
+            yield json.loads(line)
+
+def write_records(sink: TextIO, records: Iterable[Dict[str, str]]) -> int:
+    written = 0
+    for rec in records:
+        json.dump(rec, sink, ensure_ascii=False)
+        sink.write("\n")
+        written += 1
+    return written
+
+# ──────────────────────────────────────────────────────────────
+#  CHECKPOINTED OUTPUT
+# ──────────────────────────────────────────────────────────────
+def checkpoint_path(out: Path) -> Path:
+    return out.with_name(out.name + ".ckpt")
+
+def load_checkpoint(out: Path) -> Optional[Dict]:
+    path = checkpoint_path(out)
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+def _save_checkpoint(path: Path, state: Dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, path)                       # atomic: a crash leaves the old one intact
+
+def write_checkpointed(out: Path, blocks: Iterable[Tuple[str, int]], every: int, meta: Dict,
+                       state: Callable[[], Dict], resume: Optional[Dict] = None) -> int:
+    """Write ``(text, records)`` blocks to ``out``, checkpointing every ``every`` records.
+
+    A checkpoint is ``meta`` plus the record count, the byte offset the data
+    is fsynced up to, and ``state()`` (whatever the producer needs to continue
+    from there). Resuming truncates ``out`` to that offset, so any partial
+    write after the last checkpoint is discarded. The file is removed once the
+    run completes.
+    """
+    ckpt = checkpoint_path(out)
+    records = resume["records"] if resume else 0
+    offset = resume["offset"] if resume else 0
+    with out.open("r+b" if resume else "wb", buffering=8 << 20) as fh:
+        fh.truncate(offset)
+        fh.seek(offset)
+        since = 0
+        for text, count in blocks:
+            data = text.encode("utf-8")
+            fh.write(data)
+            offset += len(data)
+            records += count
+            since += count
+            if since >= every:
+                fh.flush()
+                os.fsync(fh.fileno())
+                _save_checkpoint(ckpt, {**meta, "records": records, "offset": offset, **state()})
+                since = 0
+    ckpt.unlink(missing_ok=True)
+    return records
+
 # ──────────────────────────────────────────────────────────────
 #  CLI
 # ──────────────────────────────────────────────────────────────
@@ -233,17 +377,109 @@ def _cli() -> None:
     ap.add_argument("n", type=int, help="Number of examples")
     ap.add_argument("--seed", type=int, default=None, help="Random seed")
     ap.add_argument("--out", type=Path, help="Output JSONL file")
+    ap.add_argument("--jobs", type=int, default=None,
+                    help="Worker processes; enables per-chunk seeding (output is the same for any value)")
+    ap.add_argument("--chunk-size", type=int, default=10_000, help="Records per chunk with --jobs")
+    ap.add_argument("--format", choices=["jsonl", "bin"], default="jsonl",
+                    help="--out format: JSONL or length-prefixed binary records (see c_records.py)")
+    ap.add_argument("--checkpoint-every", type=int, default=1_000_000,
+                    help="Persist a resume point every N records of --out JSONL (0 = off)")
+    ap.add_argument("--resume", action="store_true",
+                    help="Truncate --out to its last checkpoint and continue from there")
+    add_dedup_args(ap)
+    add_verify_args(ap)
+    add_shard_args(ap)
     args = ap.parse_args()
+    if args.out and args.out_dir:
+        ap.error("--out and --out-dir are mutually exclusive")
+    if args.format == "bin" and not args.out:
+        ap.error("--format bin needs --out")
+    # dedup/verify state is not persisted, so only plain generation is resumable
+    checkpointing = (args.out is not None and args.format == "jsonl" and args.checkpoint_every > 0
+                     and args.dedup == "off" and not args.verify)
+    if args.resume and not checkpointing:
+        ap.error("--resume needs --out JSONL with checkpoints on and without --dedup/--verify")
+    resume = load_checkpoint(args.out) if args.resume else None
+    if args.resume and resume is None:
+        print(f"[*] no checkpoint for {args.out}; starting from scratch", file=sys.stderr)
 
-    rng = random.Random(args.seed)
-    sink = args.out.open("w", encoding="utf-8") if args.out else sys.stdout
+    verifier = verifier_from_args(args) if args.verify else None
+    if args.jobs is not None:
+        if args.seed is not None:
+            seed = args.seed
+        elif resume is not None:
+            seed = resume["seed"]
+        else:
+            seed = random.SystemRandom().getrandbits(63)
+        jobs = args.jobs or os.cpu_count() or 1
+        records: Iterable[Dict[str, str]] = iter_chunked_records(args.n, seed, args.chunk_size, jobs)
+    else:
+        rng = random.Random(args.seed)
+        records = (make_record(rng) for _ in range(args.n))
+    deduper = deduper_from_args(args) if args.dedup != "off" else None
+    if deduper is not None:
+        records = deduper.filter(records)       # before --verify: never compile a dupe
+    if verifier is not None:
+        records = verifier.verify(records)
+    # chunk text is written as-is unless something needs the parsed records
+    raw_chunks = (args.jobs is not None and verifier is None and deduper is None
+                  and args.format == "jsonl")
 
-    for _ in range(args.n):
-        json.dump(make_record(rng), sink, ensure_ascii=False)
-        sink.write("\n")
+    if checkpointing:
+        meta = {"version": 1, "n": args.n, "chunked": args.jobs is not None,
+                "seed": seed if args.jobs is not None else args.seed, "chunk_size": args.chunk_size}
+        if resume is not None:
+            if {k: resume.get(k) for k in meta} != meta:
+                sys.exit(f"✖ {checkpoint_path(args.out)} was written for different arguments")
+            print(f"[*] resuming at record {resume['records']:,} (byte {resume['offset']:,})",
+                  file=sys.stderr)
+        done = resume["records"] if resume else 0
+        if args.jobs is not None:
+            blocks: Iterable[Tuple[str, int]] = (
+                (text, text.count("\n"))
+                for text in iter_chunks(args.n, seed, args.chunk_size, jobs, start=done // args.chunk_size))
+            state: Callable[[], Dict] = dict
+        else:
+            if resume is not None:
+                version, internal, gauss = resume["rng"]
+                rng.setstate((version, tuple(internal), gauss))
+            blocks = ((json.dumps(make_record(rng), ensure_ascii=False) + "\n", 1)
+                      for _ in range(done, args.n))
+            state = lambda: {"rng": rng.getstate()}
+        written = write_checkpointed(args.out, blocks, args.checkpoint_every, meta, state, resume)
+    elif args.format == "bin":
+        written = 0
+        with RecordWriter(args.out) as writer:
+            for rec in records:
+                writer.write(rec)
+                written += 1
+    elif args.out_dir:
+        written = 0
+        with writer_from_args(args) as writer:
+            if raw_chunks:
+                for text in iter_chunks(args.n, seed, args.chunk_size, jobs):
+                    writer.write_lines(text.encode("utf-8"))
+                    written += text.count("\n")
+            else:
+                for rec in records:
+                    writer.write(rec)
+                    written += 1
+    else:
+        sink = args.out.open("w", encoding="utf-8", buffering=8 << 20) if args.out else sys.stdout
+        if raw_chunks:
+            written = write_chunked(sink, args.n, seed, args.chunk_size, jobs)
+        else:
+            written = write_records(sink, records)
+        if args.out:
+            sink.close()
+
+    if deduper is not None:
+        print(f"[*] {deduper.stats.summary()}", file=sys.stderr)
+    if verifier is not None:
+        verifier.report(args.verify_summary)
 
-    if args.out:
-        print(f"✔ wrote {args.n:,} records → {args.out}")
+    if args.out or args.out_dir:
+        print(f"✔ wrote {written:,} records → {args.out or args.out_dir}")
 
 # ──────────────────────────────────────────────────────────────
 if __name__ == "__main__":
@@ -15,24 +15,45 @@ Usage
 # 1 000 tasks, deterministic, write to file
 python c_task_factory.py 1000 --seed 123 --out c_train.jsonl
 
+# 1M tasks as gzip shards of 100k records + offset index
+python c_task_factory.py 1000000 --seed 123 --out-dir ds/ --shard-records 100000 --compress gzip
+
+# binary records (see c_records.py) instead of JSONL
+python c_task_factory.py 1000000 --seed 123 --out c_train.crec --format bin
+
 # quick sanity-print 5 tasks to console
 python c_task_factory.py 5
+
+# compile + run every answer's asserts, keep failures flagged
+python c_task_factory.py 1000 --seed 123 --out c_train.jsonl --verify --verify-fail flag
 """
 from __future__ import annotations
 
 import argparse
 import json
-import math
 import random
 import sys
 from pathlib import Path
 from typing import Callable, Dict, List, Tuple
 
+from c_dedup import add_dedup_args, deduper_from_args
+from c_oracles import Oracles
+from c_records import RecordWriter
+from c_shards import add_shard_args, writer_from_args
+from c_task_verify import add_verify_args, verifier_from_args
+
 # ──────────────────────────────────────────────────────────────
 #  TASK DEFINITIONS
 # ──────────────────────────────────────────────────────────────
 TaskGen = Callable[[random.Random], Tuple[str, str]]  # -> (question, answer)
 
+# value ranges the tasks draw from; the oracle tables are sized to cover them
+GCD_RANGE = (10, 200)
+FACTORIAL_RANGE = (0, 10)
+PRIME_RANGE = (2, 50)
+
+ORACLE = Oracles(prime_limit=PRIME_RANGE[1], factorial_limit=FACTORIAL_RANGE[1])
+
 def _wrap(code_body: str) -> str:
     """Add common #includes once per answer."""
     return (
@@ -42,7 +63,7 @@ def _wrap(code_body: str) -> str:
     )
 
 def task_gcd(rng: random.Random) -> Tuple[str, str]:
-    pairs = [(rng.randint(10, 200), rng.randint(10, 200)) for _ in range(3)]
+    pairs = [(rng.randint(*GCD_RANGE), rng.randint(*GCD_RANGE)) for _ in range(3)]
     q = "Write a C function `int gcd(int a, int b)` that returns the greatest common divisor of `a` and `b` using Euclid's algorithm. Include a `main` that asserts the function on a few cases."
     fn = (
         "int gcd(int a, int b) {\n"
@@ -50,7 +71,7 @@ def task_gcd(rng: random.Random) -> Tuple[str, str]:
         "}\n"
     )
     tests = "\n".join(
-        f"    assert(gcd({a},{b}) == {math.gcd(a,b)});"
+        f"    assert(gcd({a},{b}) == {ORACLE.gcd(a, b)});"
         for a, b in pairs
     )
     main = (
@@ -63,7 +84,7 @@ def task_gcd(rng: random.Random) -> Tuple[str, str]:
     return q, _wrap(fn + "\n" + main)
 
 def task_factorial(rng: random.Random) -> Tuple[str, str]:
-    nums = [rng.randint(0, 10) for _ in range(3)]
+    nums = [rng.randint(*FACTORIAL_RANGE) for _ in range(3)]
     q = "Write a C function `unsigned long factorial(unsigned int n)` that returns `n!` recursively. Provide a `main` with asserts."
     fn = (
         "unsigned long factorial(unsigned int n) {\n"
@@ -71,7 +92,7 @@ def task_factorial(rng: random.Random) -> Tuple[str, str]:
         "}\n"
     )
     tests = "\n".join(
-        f"    assert(factorial({n}) == {math.factorial(n)}UL);"
+        f"    assert(factorial({n}) == {ORACLE.factorial(n)}UL);"
         for n in nums
     )
     main = (
@@ -84,7 +105,7 @@ def task_factorial(rng: random.Random) -> Tuple[str, str]:
     return q, _wrap(fn + "\n" + main)
 
 def task_is_prime(rng: random.Random) -> Tuple[str, str]:
-    nums = [rng.randint(2, 50) for _ in range(5)]
+    nums = [rng.randint(*PRIME_RANGE) for _ in range(5)]
     q = "Write a C function `int is_prime(int n)` that returns 1 if `n` is prime, else 0. Add a `main` that asserts several inputs."
     fn = (
         "int is_prime(int n) {\n"
@@ -96,7 +117,7 @@ def task_is_prime(rng: random.Random) -> Tuple[str, str]:
         "}\n"
     )
     tests = "\n".join(
-        f"    assert(is_prime({n}) == {1 if all(n%d for d in range(2,int(n**0.5)+1)) else 0});"
+        f"    assert(is_prime({n}) == {int(ORACLE.is_prime(n))});"
         for n in nums
     )
     main = (
@@ -132,18 +153,54 @@ def _cli() -> None:
     ap.add_argument("n", type=int, help="Number of examples to generate")
     ap.add_argument("--seed", type=int, help="Random seed")
     ap.add_argument("--out", type=Path, help="Path to JSONL output")
+    ap.add_argument("--format", choices=["jsonl", "bin"], default="jsonl",
+                    help="--out format: JSONL or length-prefixed binary records (see c_records.py)")
+    add_dedup_args(ap)
+    add_verify_args(ap)
+    add_shard_args(ap)
     args = ap.parse_args()
+    if args.out and args.out_dir:
+        ap.error("--out and --out-dir are mutually exclusive")
+    if args.format == "bin" and not args.out:
+        ap.error("--format bin needs --out")
 
     rng = random.Random(args.seed)
-    sink = args.out.open("w", encoding="utf-8") if args.out else sys.stdout
-
-    for _ in range(args.n):
-        rec = make_record(rng)
-        json.dump(rec, sink, ensure_ascii=False)
-        sink.write("\n")
 
-    if args.out:
-        print(f"✔ wrote {args.n:,} records → {args.out}")
+    records = (make_record(rng) for _ in range(args.n))
+    deduper = deduper_from_args(args) if args.dedup != "off" else None
+    if deduper is not None:
+        records = deduper.filter(records)       # before --verify: never compile a dupe
+    verifier = verifier_from_args(args) if args.verify else None
+    if verifier is not None:
+        records = verifier.verify(records)
+
+    written = 0                                 # dedup/verify may drop records
+    if args.format == "bin":
+        with RecordWriter(args.out) as writer:
+            for rec in records:
+                writer.write(rec)
+                written += 1
+    elif args.out_dir:
+        with writer_from_args(args) as writer:
+            for rec in records:
+                writer.write(rec)
+                written += 1
+    else:
+        sink = args.out.open("w", encoding="utf-8", buffering=8 << 20) if args.out else sys.stdout
+        for rec in records:
+            json.dump(rec, sink, ensure_ascii=False)
+            sink.write("\n")
+            written += 1
+        if args.out:
+            sink.close()
+
+    if deduper is not None:
+        print(f"[*] {deduper.stats.summary()}", file=sys.stderr)
+    if verifier is not None:
+        verifier.report(args.verify_summary)
+
+    if args.out or args.out_dir:
+        print(f"✔ wrote {written:,} records → {args.out or args.out_dir}")
 
 if __name__ == "__main__":
     _cli()
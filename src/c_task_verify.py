@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# c_task_verify.py · v0.1.0
+"""
+Execution-verify task records: compile each code answer and run its asserts.
+
+Highlights
+----------
+* Answers that are C programs (raw source or a ```c fenced block) are compiled
+  and executed in a sandboxed child (rlimits, empty env, scratch cwd, timeout)
+* Compile+run jobs fan out over a pool of worker processes, or with
+  --verify-engine async over compiler/test subprocesses driven by one asyncio
+  loop (c_scheduler.py) while generation keeps feeding it
+* Identical answers are compiled once per run, and the CompileCache from
+  c_compile.py remembers verdicts across runs
+* Failing records are dropped or flagged (``"verified": false``); a JSON
+  summary with records/s is written at the end
+
+Usage
+-----
+python c_task_verify.py c_train.jsonl --out c_train.verified.jsonl
+python c_task_factory_advanced.py 100000 --seed 1 --out c_train.jsonl --verify
+python c_task_factory_advanced.py 100000 --seed 1 --out c_train.jsonl --verify --verify-engine async
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from c_compile import DEFAULT_CACHE, CompileCache, find_compiler
+from c_scheduler import Scheduler
+
+try:                                    # POSIX only; without it we rely on the timeout
+    import resource
+except ImportError:                     # pragma: no cover
+    resource = None
+
+__version__ = "0.1.0"
+
+RUN_FLAGS: Tuple[str, ...] = ("-std=c17", "-O0", "-w")
+CPU_SECONDS = 5
+MEMORY_BYTES = 256 << 20
+FILE_BYTES = 1 << 20
+
+_FENCED_C = re.compile(r"```c\n(.*?)```", re.S)
+
+# ──────────────────────────────────────────────────────────────
+#  Sandboxed compile + run (worker side)
+# ──────────────────────────────────────────────────────────────
+def extract_code(answer: str) -> Optional[str]:
+    """The C program inside an answer, or ``None`` for prose answers."""
+    if answer.lstrip().startswith("#include"):
+        return answer
+    blocks = _FENCED_C.findall(answer)
+    return blocks[-1] if blocks else None
+
+def _sandbox() -> None:
+    resource.setrlimit(resource.RLIMIT_CPU, (CPU_SECONDS, CPU_SECONDS))
+    resource.setrlimit(resource.RLIMIT_AS, (MEMORY_BYTES, MEMORY_BYTES))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (FILE_BYTES, FILE_BYTES))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+def _failure(stage: str, returncode: int, stderr: str) -> Tuple[bool, str, bool]:
+    if returncode < 0:                  # killed by a signal (rlimit, OOM, ...): not a verdict
+        return False, f"{stage}: killed by signal {-returncode}\n{stderr}", False
+    if stage == "compile":
+        return False, f"compile:\n{stderr}", True
+    return False, f"run: exit status {returncode}\n{stderr}", True
+
+def run_program(compiler: str, flags: Sequence[str], code: str, timeout: float) -> Tuple[bool, str, bool]:
+    """Compile ``code`` and run it; passes when it exits 0 within ``timeout``.
+
+    Returns ``(ok, error, final)``; ``final`` is False for timeouts and signal
+    deaths, which depend on load and limits rather than on the program alone.
+    """
+    with tempfile.TemporaryDirectory(prefix="c_verify_") as tmp:
+        exe = os.path.join(tmp, "a.out")
+        try:
+            cc = subprocess.run([compiler, "-x", "c", "-", *flags, "-o", exe], input=code,
+                                text=True, capture_output=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return False, f"compile: timed out after {timeout}s", False
+        if cc.returncode != 0:
+            return _failure("compile", cc.returncode, cc.stderr)
+        try:
+            proc = subprocess.run([exe], cwd=tmp, env={}, stdin=subprocess.DEVNULL,
+                                  capture_output=True, text=True, timeout=timeout,
+                                  preexec_fn=_sandbox if resource else None)
+        except subprocess.TimeoutExpired:
+            return False, f"run: timed out after {timeout}s", False
+        if proc.returncode != 0:
+            return _failure("run", proc.returncode, proc.stderr)
+    return True, "", True
+
+async def run_program_async(sched: Scheduler, compiler: str, flags: Sequence[str], code: str,
+                            timeout: float) -> Tuple[bool, str, bool]:
+    """:func:`run_program` with both children started through ``sched``."""
+    with tempfile.TemporaryDirectory(prefix="c_verify_") as tmp:
+        exe = os.path.join(tmp, "a.out")
+        cc = await sched.exec([compiler, "-x", "c", "-", *flags, "-o", exe], code, timeout)
+        if cc.timed_out:
+            return False, f"compile: timed out after {timeout}s", False
+        if cc.returncode != 0:
+            return _failure("compile", cc.returncode, cc.stderr)
+        proc = await sched.exec([exe], None, timeout, cwd=tmp, env={},
+                                preexec_fn=_sandbox if resource else None)
+        if proc.timed_out:
+            return False, f"run: timed out after {timeout}s", False
+        if proc.returncode != 0:
+            return _failure("run", proc.returncode, proc.stderr)
+    return True, "", True
+
+# ──────────────────────────────────────────────────────────────
+#  Verifier (main-process side)
+# ──────────────────────────────────────────────────────────────
+@dataclass
+class VerifyStats:
+    records: int = 0
+    code_records: int = 0
+    unique_programs: int = 0
+    compiled: int = 0
+    cache_hits: int = 0
+    passed: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    records_per_sec: float = 0.0
+    failures: List[Dict[str, str]] = field(default_factory=list)   # first few only
+
+class AnswerVerifier:
+    """Stream records through compile+run verification, preserving order."""
+
+    def __init__(self, jobs: Optional[int] = None, timeout: float = 10.0,
+                 flags: Sequence[str] = RUN_FLAGS, cache: Optional[CompileCache] = None,
+                 on_fail: str = "drop", max_failures: int = 5, engine: str = "pool") -> None:
+        if on_fail not in ("drop", "flag"):
+            raise ValueError(f"on_fail must be 'drop' or 'flag', not {on_fail!r}")
+        if engine not in ("pool", "async"):
+            raise ValueError(f"engine must be 'pool' or 'async', not {engine!r}")
+        self.engine = engine
+        self.compiler = find_compiler()
+        if self.compiler is None:
+            raise RuntimeError("No C compiler found for --verify")
+        self.jobs = jobs or os.cpu_count() or 1
+        self.timeout = timeout
+        self.flags = list(flags)
+        self.cache = cache
+        self.on_fail = on_fail
+        self.max_failures = max_failures
+        self.stats = VerifyStats()
+
+    def _cache_key(self, code: str) -> Optional[str]:
+        """Run verdicts also depend on the timeout and the sandbox limits."""
+        if self.cache is None:
+            return None
+        limits = (f"timeout={self.timeout}", f"cpu={CPU_SECONDS}", f"as={MEMORY_BYTES}",
+                  f"fsize={FILE_BYTES}", f"rlimits={resource is not None}")
+        return self.cache.key(code, self.compiler, [*self.flags, "run", *limits])
+
+    def _submit(self, pool: ProcessPoolExecutor, code: str) -> Tuple[Optional[bool], Optional[Future], Optional[str]]:
+        key = self._cache_key(code)
+        hit = self.cache.get(key) if key is not None else None
+        if hit is not None:
+            self.stats.cache_hits += 1
+            return hit[0], None, None
+        self.stats.compiled += 1
+        return None, pool.submit(run_program, self.compiler, self.flags, code, self.timeout), key
+
+    def _record_failure(self, digest: bytes, ok: bool, err: str) -> None:
+        if not ok and len(self.stats.failures) < self.max_failures:
+            self.stats.failures.append({"digest": digest.hex(), "error": err[:2000]})
+
+    def _outcome(self, rec: Dict[str, str], ok: Optional[bool]) -> Iterator[Dict[str, str]]:
+        if ok is None:                          # prose answer: nothing to run
+            yield rec
+            return
+        self.stats.passed += ok
+        self.stats.failed += not ok
+        if ok or self.on_fail == "flag":
+            yield {**rec, "verified": ok} if self.on_fail == "flag" else rec
+
+    def verify(self, records: Iterable[Dict[str, str]]) -> Iterator[Dict[str, str]]:
+        """Yield verified records (failing ones dropped or flagged)."""
+        started = time.perf_counter()
+        if self.engine == "async":
+            yield from self._verify_async(records)
+        else:
+            yield from self._verify_pool(records)
+        self.stats.seconds = time.perf_counter() - started
+        self.stats.records_per_sec = self.stats.records / self.stats.seconds if self.stats.seconds else 0.0
+
+    def _verify_async(self, records: Iterable[Dict[str, str]]) -> Iterator[Dict[str, str]]:
+        sched = Scheduler(self.jobs)
+        shared: Dict[bytes, asyncio.Future] = {}
+
+        def feed() -> Iterator[Tuple[Dict[str, str], Optional[str]]]:
+            for rec in records:
+                self.stats.records += 1
+                code = extract_code(rec.get("answer", ""))
+                self.stats.code_records += code is not None
+                yield rec, code
+
+        async def settle(code: str, digest: bytes) -> bool:
+            key = self._cache_key(code)
+            hit = self.cache.get(key) if key is not None else None
+            if hit is not None:
+                self.stats.cache_hits += 1
+                return hit[0]
+            self.stats.compiled += 1
+            ok, err, final = await run_program_async(sched, self.compiler, self.flags, code, self.timeout)
+            if key is not None and final:
+                self.cache.put(key, ok, err)
+            self._record_failure(digest, ok, err)
+            return ok
+
+        async def job(item: Tuple[Dict[str, str], Optional[str]]) -> Tuple[Dict[str, str], Optional[bool]]:
+            rec, code = item
+            if code is None:
+                return rec, None
+            digest = hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest()
+            fut = shared.get(digest)
+            if fut is None:                     # first sighting: duplicates await the same run
+                self.stats.unique_programs += 1
+                fut = shared[digest] = asyncio.ensure_future(settle(code, digest))
+            return rec, await fut
+
+        for rec, ok in sched.iter_results(feed(), job):
+            yield from self._outcome(rec, ok)
+
+    def _verify_pool(self, records: Iterable[Dict[str, str]]) -> Iterator[Dict[str, str]]:
+        verdicts: Dict[bytes, bool] = {}
+        inflight: Dict[bytes, Tuple[Future, Optional[str]]] = {}
+        pending: Deque[Tuple[Dict[str, str], Optional[bytes]]] = deque()
+        window = 8 * self.jobs
+
+        def resolve(digest: bytes) -> bool:
+            if digest not in verdicts:
+                fut, key = inflight.pop(digest)
+                ok, err, final = fut.result()
+                if key is not None and final:
+                    self.cache.put(key, ok, err)
+                self._record_failure(digest, ok, err)
+                verdicts[digest] = ok
+            return verdicts[digest]
+
+        def emit(rec: Dict[str, str], digest: Optional[bytes]) -> Iterator[Dict[str, str]]:
+            yield from self._outcome(rec, None if digest is None else resolve(digest))
+
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            for rec in records:
+                self.stats.records += 1
+                code = extract_code(rec.get("answer", ""))
+                digest = None
+                if code is not None:
+                    self.stats.code_records += 1
+                    digest = hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest()
+                    if digest not in verdicts and digest not in inflight:
+                        self.stats.unique_programs += 1
+                        ok, fut, key = self._submit(pool, code)
+                        if fut is None:
+                            verdicts[digest] = ok
+                        else:
+                            inflight[digest] = (fut, key)
+                pending.append((rec, digest))
+                if len(pending) > window:
+                    yield from emit(*pending.popleft())
+            while pending:
+                yield from emit(*pending.popleft())
+
+    def summary(self) -> Dict:
+        out = asdict(self.stats)
+        out["compiler"] = self.compiler
+        out["on_fail"] = self.on_fail
+        out["engine"] = self.engine
+        if self.cache is not None:
+            out["cache"] = self.cache.summary()
+        return out
+
+    def report(self, path: Optional[Path]) -> None:
+        """Print a one-line summary and optionally write the JSON summary."""
+        s = self.stats
+        print(f"[*] verify: {s.passed:,}/{s.code_records:,} code answers passed, "
+              f"{s.unique_programs:,} unique, {s.compiled:,} compiled · "
+              f"{s.records_per_sec:,.1f} records/s", file=sys.stderr)
+        if path is not None:
+            path.write_text(json.dumps(self.summary(), indent=2) + "\n", encoding="utf-8")
+
+def add_verify_args(ap: argparse.ArgumentParser, switch: bool = True) -> None:
+    """The --verify option group shared by the task-factory CLIs."""
+    g = ap.add_argument_group("verification")
+    if switch:
+        g.add_argument("--verify", action="store_true", help="Compile and run every code answer")
+    g.add_argument("--verify-fail", choices=["drop", "flag"], default="drop",
+                   help="Drop failing records or keep them with verified=false")
+    g.add_argument("--verify-jobs", type=int, default=None,
+                   help="Compile/run worker processes (async: concurrent child processes)")
+    g.add_argument("--verify-engine", choices=["pool", "async"], default="pool",
+                   help="Process pool, or one asyncio loop driving compiler/test subprocesses")
+    g.add_argument("--verify-timeout", type=float, default=10.0, help="Per-program timeout (s)")
+    g.add_argument("--verify-summary", type=Path, help="Write the verification summary JSON here")
+    g.add_argument("--no-cache", action="store_true", help="Bypass the compile-result cache")
+
+def verifier_from_args(args: argparse.Namespace) -> AnswerVerifier:
+    cache = None if args.no_cache else CompileCache(DEFAULT_CACHE)
+    return AnswerVerifier(jobs=args.verify_jobs, timeout=args.verify_timeout,
+                          cache=cache, on_fail=args.verify_fail, engine=args.verify_engine)
+
+# ──────────────────────────────────────────────────────────────
+#  CLI
+# ──────────────────────────────────────────────────────────────
+def _cli() -> None:
+    ap = argparse.ArgumentParser(description="Execution-verify a C task JSONL file.")
+    ap.add_argument("src", type=Path, help="Input JSONL")
+    ap.add_argument("--out", type=Path, help="Verified JSONL (default: stdout)")
+    add_verify_args(ap, switch=False)
+    args = ap.parse_args()
+
+    verifier = verifier_from_args(args)
+    sink = args.out.open("w", encoding="utf-8") if args.out else sys.stdout
+    with args.src.open(encoding="utf-8") as fh:
+        for rec in verifier.verify(json.loads(line) for line in fh):
+            json.dump(rec, sink, ensure_ascii=False)
+            sink.write("\n")
+    if args.out:
+        sink.close()
+    verifier.report(args.verify_summary)
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,28 @@
+"""Ground-truth checks for the task factories' oracles."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import pytest
+
+from c_oracles import Oracles, PrimeSieve
+
+def _naive_prime(n: int) -> bool:
+    return n > 1 and all(n % d for d in range(2, int(n ** 0.5) + 1))
+
+@pytest.mark.parametrize("limit", [0, 1, 2, 3, 4, 10, 97])
+def test_primes_just_above_the_sieve(limit: int) -> None:
+    sieve = PrimeSieve(limit)
+    for n in range(-3, 200):
+        assert (n in sieve) == _naive_prime(n), n
+    assert len(sieve.flags) == sieve.limit + 1       # queries never grow the table
+
+def test_large_prime_and_helpers() -> None:
+    oracle = Oracles(prime_limit=100)
+    assert oracle.is_prime(9_999_991) and not oracle.is_prime(9_999_993)
+    assert oracle.gcd(12, 18) == 6
+    assert oracle.factorial(10) == 3_628_800
+    assert oracle.sorted_index([1, 3, 5, 7], 5) == 2
+    with pytest.raises(ValueError):
+        oracle.sorted_index([1, 3], 2)
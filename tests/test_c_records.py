@@ -0,0 +1,57 @@
+"""Round-trip and lifetime checks for the ``.crec`` reader/writer."""
+import gc
+import struct
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import pytest
+
+from c_records import RecordReader, RecordWriter
+
+RECORDS = [
+    {"instruction": "i0", "question": "q0 ü", "answer": "a0", "verified": True},
+    {"instruction": "i1", "question": "", "answer": "a1"},
+    {"instruction": "i2", "question": "q2", "answer": "a2", "explanation": "e2", "verified": False},
+]
+
+@pytest.fixture
+def crec(tmp_path: Path) -> Path:
+    path = tmp_path / "t.crec"
+    with RecordWriter(path) as writer:
+        for rec in RECORDS:
+            writer.write(rec)
+    return path
+
+def test_round_trip(crec: Path) -> None:
+    with RecordReader(crec) as reader:
+        assert list(reader) == RECORDS
+        assert bytes(reader.field(0, "question")) == "q0 ü".encode()
+        assert reader.field(1, "explanation") is None
+
+def test_footer_is_little_endian(crec: Path) -> None:
+    data = crec.read_bytes()
+    count, magic = struct.unpack_from("<Q4s", data, len(data) - 12)
+    assert (count, magic) == (len(RECORDS), b"CIDX")
+    table = struct.unpack_from(f"<{count}Q", data, len(data) - 12 - 8 * count)
+    with RecordReader(crec) as reader:
+        assert list(reader._offsets) == list(table)
+
+def test_close_with_live_views(crec: Path) -> None:
+    reader = RecordReader(crec)
+    answer = reader.field(2, "answer")
+    spans = reader.spans(0)
+    reader.close()                      # must not raise BufferError
+    assert bytes(answer) == b"a2"       # views stay readable until dropped
+    assert bytes(spans[1]) == "q0 ü".encode()
+    reader.close()                      # idempotent
+    del answer, spans
+    gc.collect()
+
+def test_torn_file_without_footer(crec: Path, tmp_path: Path) -> None:
+    data = crec.read_bytes()
+    torn = tmp_path / "torn.crec"
+    torn.write_bytes(data[:len(data) - 12 - 8 * len(RECORDS) - 1])
+    with RecordReader(torn) as reader:
+        assert list(reader) == RECORDS[:2]
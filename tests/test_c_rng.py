@@ -0,0 +1,37 @@
+"""Determinism and interface checks for the ``--rng numpy`` block provider."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import pytest
+
+pytest.importorskip("numpy", reason="BlockRandom needs numpy; --rng numpy is optional")
+
+from c_rng import BlockRandom, make_rng
+
+def _draws(rng, n=2000):
+    return ([rng.random() for _ in range(n)], [rng.randint(-5, 5) for _ in range(n)],
+            rng.getrandbits(200), rng.choices("abc", weights=[1, 2, 3], k=50),
+            rng.sample(range(100), 10))
+
+def test_seed_fixes_output_independent_of_block_size() -> None:
+    assert _draws(BlockRandom(7, block=64)) == _draws(BlockRandom(7, block=1 << 16))
+    assert _draws(BlockRandom(7)) != _draws(BlockRandom(8))
+
+def test_ranges() -> None:
+    rng = make_rng("numpy", 3)
+    assert all(0.0 <= rng.random() < 1.0 for _ in range(10_000))
+    assert {rng.randint(1, 3) for _ in range(1000)} == {1, 2, 3}
+    assert all(0 <= rng.randrange(1 << 70) < 1 << 70 for _ in range(100))
+    assert all(0 <= rng.getrandbits(5) < 32 for _ in range(1000))
+    with pytest.raises(ValueError):
+        rng.randrange(0)
+    with pytest.raises(IndexError):
+        rng.choice([])
+
+def test_generated_files_and_manifest() -> None:
+    from c_gen_adv import CConfig, _manifest, build_c
+    cfg = CConfig(loc=200, seed=11, rng="numpy")
+    assert build_c(cfg) == build_c(CConfig(loc=200, seed=11, rng="numpy"))
+    assert _manifest(cfg, 11, 1)["rng_version"].startswith("numpy ")
@@ -0,0 +1,30 @@
+"""Shape checks for the ``--variants`` renders (rename / strip)."""
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import pytest
+
+from c_gen_adv import CConfig, build_program, parse_variants
+
+_ENUM = re.compile(r"typedef enum \{ ([^}]*) \} (\w+);")
+
+@pytest.mark.parametrize("seed", range(10))
+def test_rename_keeps_enum_item_shape(seed: int) -> None:
+    program = build_program(CConfig(loc=300, seed=seed, weights={**CConfig().weights, "enum": 0.3}))
+    original = program.render()
+    renamed = parse_variants("rename")[0].apply(program, seed)
+    assert renamed != original
+    enums = _ENUM.findall(renamed)
+    assert len(enums) == len(_ENUM.findall(original)) > 0
+    for items, name in enums:
+        assert items.split(", ") == [f"{name.upper()}_{i}" for i in range(items.count(",") + 1)]
+
+def test_strip_keeps_file_header() -> None:
+    program = build_program(CConfig(loc=300, seed=5))
+    for spec in ("kr+strip", "gnu+rename+strip"):
+        code = parse_variants(spec)[0].apply(program, 5)
+        assert code.startswith("/* Auto-generated C code */\n\n")
+        assert "//" not in code